@@ -0,0 +1,176 @@
+"""funding_curve/bench.py
+
+Micro‑benchmarks for the live hot path and the CLI start‑up budget.
+
+* ``imports`` – runs ``python -X importtime`` in a fresh interpreter for
+  the CLI and every subcommand module and reports cumulative import time.
+  ``funding_curve.cli`` itself must stay under ``CLI_IMPORT_BUDGET_MS``;
+  heavy dependencies belong inside the subcommand that needs them.
+* ``decode`` – Binance ``markPriceUpdate`` frame → ``FundingPrint``.
+* ``builder`` – ``FundingCurveBuilder.update`` emitting a snapshot per print.
+* ``rollup`` – ``CurveRollup.update_curve`` (1 s / 1 min / 10 min cascade).
+* ``engine`` – ``CurveEngine`` batched update + cross‑sectional snapshot
+  across thousands of instruments.
+
+Run via ``funding-curve bench [NAME ...]``.
+"""
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+__all__ = ["BENCHES", "IMPORT_BUDGET_MS", "SUBCOMMAND_MODULES", "import_times", "run"]
+
+IMPORT_BUDGET_MS = float(os.getenv("CLI_IMPORT_BUDGET_MS", "150"))
+
+# Modules each subcommand imports on dispatch (see ``funding_curve.cli``).
+SUBCOMMAND_MODULES: Dict[str, str] = {
+    "ingest": "funding_curve.pipelines.ingest",
+    "live": "funding_curve.pipelines.snapshot",
+    "features": "funding_curve.feature_build",
+    "compact": "funding_curve.storage.migrate",
+    "query": "funding_curve.storage.query",
+}
+
+_IMPORTTIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)")
+
+
+def _timeit(fn: Callable[[], None], n: int) -> float:
+    """Best‑of‑three mean seconds per call of *fn* over *n* calls."""
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / n)
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Import time
+# ---------------------------------------------------------------------------
+
+def import_times(modules: Sequence[str]) -> Dict[str, float]:
+    """Cumulative import time (ms) of each module in a fresh interpreter."""
+    out: Dict[str, float] = {}
+    for mod in modules:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {mod}"],
+            capture_output=True, text=True, check=True,
+        )
+        for line in proc.stderr.splitlines():
+            m = _IMPORTTIME.match(line)
+            if m and m.group(2) == mod:
+                out[mod] = int(m.group(1)) / 1000
+    return out
+
+
+def bench_imports() -> bool:
+    times = import_times(["funding_curve.cli", *SUBCOMMAND_MODULES.values()])
+    for mod, ms in times.items():
+        print(f"  {mod:<38} {ms:8.1f} ms")
+    cli_ms = times.get("funding_curve.cli", float("inf"))
+    ok = cli_ms <= IMPORT_BUDGET_MS
+    print(f"  cli import {cli_ms:.1f} ms / budget {IMPORT_BUDGET_MS:.0f} ms → {'ok' if ok else 'OVER BUDGET'}")
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# Hot path
+# ---------------------------------------------------------------------------
+
+def bench_decode(n: int = 100_000) -> bool:
+    from funding_curve.funding_collectors import BinanceCollector
+
+    collector = BinanceCollector()
+    frame = (
+        b'{"e":"markPriceUpdate","E":1746500000000,"s":"BTCUSDT","p":"94000.10000000",'
+        b'"i":"94010.00000000","P":"94100.00000000","r":"0.00010000","T":1746518400000}'
+    )
+    sec = _timeit(lambda: collector._parse_mark_price(frame), n)
+    print(f"  decode   {sec * 1e6:8.2f} µs/frame")
+    return True
+
+
+def bench_builder(n: int = 5_000) -> bool:
+    from funding_curve.builders.curve import FundingCurveBuilder
+    from funding_curve.funding_collectors import FundingPrint
+
+    builder = FundingCurveBuilder(emit_on_roll=False)
+    eight_h = 8 * 3_600_000
+    prints = [
+        FundingPrint("binance", "BTCUSDT", 1_746_500_000_000 + i, 1e-4, 1_746_518_400_000 + i * eight_h)
+        for i in range(n + 8)
+    ]
+    for fp in prints[:8]:
+        builder.update(fp)
+    t0 = time.perf_counter()
+    for fp in prints[8:]:
+        builder.update(fp)
+    sec = (time.perf_counter() - t0) / n
+    print(f"  builder  {sec * 1e6:8.2f} µs/snapshot")
+    return True
+
+
+def bench_rollup(n: int = 200_000) -> bool:
+    import numpy as np
+
+    from funding_curve.builders.rollup import CurveRollup
+
+    rollup = CurveRollup()
+    values = np.full(8, 0.1)
+    key = ("binance", "BTCUSDT")
+    t0 = time.perf_counter()
+    for i in range(n):
+        rollup.update_curve(key, 1_746_500_000_000 + i * 100, values)  # 10 Hz
+    sec = (time.perf_counter() - t0) / n
+    print(f"  rollup   {sec * 1e6:8.2f} µs/curve")
+    return True
+
+
+def bench_engine(instruments: int = 5_000) -> bool:
+    from funding_curve.builders.engine import CurveEngine
+    from funding_curve.funding_collectors import FundingPrint
+
+    engine = CurveEngine()
+    eight_h = 8 * 3_600_000
+    prints = [
+        FundingPrint("binance", f"S{i % instruments}", 1_746_500_000_000, 1e-4,
+                     1_746_518_400_000 + (i // instruments) * eight_h)
+        for i in range(instruments * 9)
+    ]
+    engine.update(prints[: instruments * 8])
+    t0 = time.perf_counter()
+    changed = engine.update(prints[instruments * 8:])
+    t1 = time.perf_counter()
+    engine.snapshot(changed)
+    t2 = time.perf_counter()
+    print(f"  engine   update {(t1 - t0) * 1e6 / instruments:8.2f} µs/print, "
+          f"snapshot {(t2 - t1) * 1e3:.1f} ms for {len(changed):,} curves")
+    return True
+
+
+BENCHES: Dict[str, Callable[[], bool]] = {
+    "imports": bench_imports,
+    "decode": bench_decode,
+    "builder": bench_builder,
+    "rollup": bench_rollup,
+    "engine": bench_engine,
+}
+
+
+def run(names: Optional[List[str]] = None) -> int:
+    """Run the named benchmarks (default: all); exit code 1 if over budget."""
+    names = names or list(BENCHES)
+    unknown = sorted(set(names) - set(BENCHES))
+    if unknown:
+        raise SystemExit(f"unknown benchmark(s) {unknown}; choose from {sorted(BENCHES)}")
+    ok = True
+    for name in names:
+        print(f"[{name}]")
+        ok &= BENCHES[name]()
+    return 0 if ok else 1
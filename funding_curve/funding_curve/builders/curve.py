@@ -11,6 +11,11 @@ into a rolling 8‑bucket (0‑64 h) forward curve.  The patched version adds:
    NaNs propagating into downstream PCA.
 3. Exponential reconnect helper removed from here — now handled in
    collectors — so no dependency changes.
+4. Hot path stays on int epoch‑ms (``FundingPrint.*_ms``); timestamps are
+   materialised once per emitted snapshot, when the DataFrame is built.
+5. State is keyed by **(exchange, symbol)**, so several symbols on one
+   venue never mix into one curve.  For thousands of instruments use the
+   vectorised ``builders.engine.CurveEngine``.
 
 Usage (unchanged API):
 
@@ -22,15 +27,19 @@ snap = builder.update(fp)
 """
 from __future__ import annotations
 
+import math
 from collections import defaultdict, deque
-from typing import Deque, Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from funding_curve.funding_collectors import FundingPrint
 
 __all__ = ["FundingCurveBuilder"]
 
+_Key = Tuple[str, str]  # (exchange, symbol)
+
 
 class FundingCurveBuilder:
     """Accumulates FundingPrints into an 8‑bucket forward curve (0‑64 h)."""
@@ -46,16 +55,16 @@ class FundingCurveBuilder:
         ----------
         emit_on_roll
             If *True* (default) the builder emits **one** snapshot per
-            funding roll (≈ every 8 h) per exchange.  Set *False* to emit a
+            funding roll (≈ every 8 h) per instrument.  Set *False* to emit a
             snapshot every time *bucket 0* updates (approx 1 Hz on Binance).
         """
         self.emit_on_roll = emit_on_roll
-        # per‑exchange deque of length 8, ordered by funding_time
-        self._buffers: Dict[str, Deque[FundingPrint]] = defaultdict(
+        # per‑(exchange, symbol) deque of length 8, ordered by funding_time
+        self._buffers: Dict[_Key, Deque[FundingPrint]] = defaultdict(
             lambda: deque(maxlen=len(self.BUCKETS_H))
         )
-        # Tracks last funding_time we emitted for each exchange
-        self._last_roll: Dict[str, pd.Timestamp] = {}
+        # Tracks last funding_time (epoch‑ms) we emitted for each key
+        self._last_roll: Dict[_Key, int] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -69,14 +78,15 @@ class FundingCurveBuilder:
         # ------------------------------------------------------------------
         # Basic sanity / gap guard
         # ------------------------------------------------------------------
-        if fp.predicted_rate is None or pd.isna(fp.predicted_rate):
+        if fp.predicted_rate is None or math.isnan(fp.predicted_rate):
             # Skip malformed prints early.
             return None
 
-        buf = self._buffers[fp.exchange]
+        key = (fp.exchange, fp.symbol)
+        buf = self._buffers[key]
 
-        # Maintain strict chronological order per exchange.
-        if buf and fp.funding_time <= buf[-1].funding_time:
+        # Maintain strict chronological order per (exchange, symbol).
+        if buf and fp.funding_time_ms <= buf[-1].funding_time_ms:
             # Duplicate or out‑of‑order → ignore.
             return None
 
@@ -90,39 +100,42 @@ class FundingCurveBuilder:
         # Throttle – emit only on first print after the funding roll.
         # ------------------------------------------------------------------
         if self.emit_on_roll:
-            last_roll = self._last_roll.get(fp.exchange)
-            if last_roll is not None and fp.funding_time == last_roll:
+            last_roll = self._last_roll.get(key)
+            if last_roll is not None and fp.funding_time_ms == last_roll:
                 return None  # same window as last emission
-            self._last_roll[fp.exchange] = fp.funding_time
+            self._last_roll[key] = fp.funding_time_ms
 
         # ------------------------------------------------------------------
         # Build snapshot (latest ts_snap sets snapshot timestamp)
         # ------------------------------------------------------------------
-        rows = []
-        for idx, item in enumerate(buf):
-            annualised = (1 + item.predicted_rate) ** (24 * 365 / 8) - 1
-            rows.append(
-                {
-                    "exchange": item.exchange,
-                    "ts_snap": item.ts_snap,
-                    "bucket_start_h": idx * 8,
-                    "bucket_end_h": (idx + 1) * 8,
-                    "fwd_rate_ann": annualised,
-                    "raw_rate": item.predicted_rate,
-                    "funding_time": item.funding_time,
-                }
-            )
-
-        return pd.DataFrame(rows)
+        n = len(buf)
+        raw = np.fromiter((item.predicted_rate for item in buf), dtype="float64", count=n)
+        return pd.DataFrame(
+            {
+                "exchange": [item.exchange for item in buf],
+                "symbol": [item.symbol for item in buf],
+                "ts_snap": pd.to_datetime([item.ts_snap_ms for item in buf], unit="ms", utc=True),
+                "bucket_start_h": np.arange(0, n * 8, 8),
+                "bucket_end_h": np.arange(8, (n + 1) * 8, 8),
+                "fwd_rate_ann": (1 + raw) ** (24 * 365 / 8) - 1,
+                "raw_rate": raw,
+                "funding_time": pd.to_datetime([item.funding_time_ms for item in buf], unit="ms", utc=True),
+            }
+        )
 
     # ------------------------------------------------------------------
     # Helper for historical ingest / testing
     # ------------------------------------------------------------------
-    def reset(self, exchange: str | None = None) -> None:
-        """Clear internal buffers (useful for unit tests / history replay)."""
+    def reset(self, exchange: str | None = None, symbol: str | None = None) -> None:
+        """Clear internal buffers (useful for unit tests / history replay).
+
+        With *exchange* only that venue's symbols are cleared; add *symbol*
+        to clear a single curve.
+        """
         if exchange is None:
             self._buffers.clear()
             self._last_roll.clear()
-        else:
-            self._buffers.pop(exchange, None)
-            self._last_roll.pop(exchange, None)
+            return
+        for key in [k for k in self._buffers if k[0] == exchange and symbol in (None, k[1])]:
+            self._buffers.pop(key, None)
+            self._last_roll.pop(key, None)
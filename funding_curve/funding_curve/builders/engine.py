@@ -0,0 +1,186 @@
+# =============================================================
+# FILE: funding_curve/builders/engine.py
+# =============================================================
+"""Multi‑symbol vectorised curve engine.
+
+``FundingCurveBuilder`` keeps one ``deque`` per (exchange, symbol) and
+every update is a Python‑level loop.  ``CurveEngine`` holds the curves of
+every (exchange, symbol) in **one** array:
+
+* ``data`` – ``float64`` array of shape *instrument × bucket × field*
+  (``FIELDS`` = raw rate, funding time ms, ts_snap ms), oldest bucket
+  first, NaN where a bucket is still empty.  Rows are handed out by an
+  instrument index map and the array grows by doubling.
+* :meth:`CurveEngine.update` – applies a whole batch of ``FundingPrint``
+  with array ops: prints are grouped by instrument, filtered with the same
+  rules as the builder (NaN rate dropped; ``funding_time`` must be strictly
+  newer than anything already seen for that instrument), and each curve
+  is shifted left by its number of new prints in one gather / scatter.
+* :meth:`CurveEngine.snapshot` / :meth:`CurveEngine.curves` – every
+  complete curve at once, long (builder / ``CURVE_LONG_SCHEMA`` columns) or
+  wide (one ``b_*`` row per instrument), from a single vectorised pass.
+
+Feeding the same prints one at a time through the builder yields the same
+curve per instrument.
+
+```python
+engine = CurveEngine()
+changed = engine.update(prints)          # list[FundingPrint] from any venue / symbol
+snap = engine.snapshot(changed)          # tidy rows for the curves that moved
+wide = engine.curves()                   # (exchange, symbol) × b_0 … b_56
+```
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from funding_curve.funding_collectors import FundingPrint
+from funding_curve.storage.schemas import BUCKET_COLS
+
+__all__ = ["CurveEngine", "FIELDS"]
+
+FIELDS: Tuple[str, ...] = ("raw_rate", "funding_time_ms", "ts_snap_ms")
+_RATE, _FUNDING, _TS = range(len(FIELDS))
+
+_N_BUCKETS = len(BUCKET_COLS)
+_ANNUALISE = 24 * 365 / 8
+_Key = Tuple[str, str]  # (exchange, symbol)
+
+
+class CurveEngine:
+    """Forward curves (0‑64 h, 8 buckets) for many instruments in one array."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.data = np.full((capacity, _N_BUCKETS, len(FIELDS)), np.nan)
+        self.filled = np.zeros(capacity, dtype="int8")        # non‑empty buckets per row
+        self._index: Dict[_Key, int] = {}
+        self._keys: List[_Key] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ------------------------------------------------------------------
+    # Instrument index
+    # ------------------------------------------------------------------
+    @property
+    def keys(self) -> List[_Key]:
+        """(exchange, symbol) per row, in row order."""
+        return list(self._keys)
+
+    def row(self, exchange: str, symbol: str) -> int:
+        """Row of (exchange, symbol), registering it on first sight."""
+        key = (exchange, symbol)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self._keys)
+            self._keys.append(key)
+            if idx == len(self.data):
+                self._grow()
+        return idx
+
+    def _grow(self) -> None:
+        cap = len(self.data)
+        self.data = np.concatenate([self.data, np.full_like(self.data, np.nan)])
+        self.filled = np.concatenate([self.filled, np.zeros(cap, dtype="int8")])
+
+    # ------------------------------------------------------------------
+    # Batched update
+    # ------------------------------------------------------------------
+    def update(self, prints: Sequence[FundingPrint]) -> np.ndarray:
+        """Apply *prints* (any mix of instruments, arrival order); return the
+        sorted rows whose curve changed and is complete."""
+        n = len(prints)
+        if n == 0:
+            return np.empty(0, dtype="int64")
+        row = np.fromiter((self.row(p.exchange, p.symbol) for p in prints), dtype="int64", count=n)
+        rate = np.fromiter((p.predicted_rate for p in prints), dtype="float64", count=n)
+        ft = np.fromiter((p.funding_time_ms for p in prints), dtype="int64", count=n)
+        ts = np.fromiter((p.ts_snap_ms for p in prints), dtype="int64", count=n)
+        return self.update_arrays(row, rate, ft, ts)
+
+    def update_arrays(self, row: np.ndarray, rate: np.ndarray, ft: np.ndarray, ts: np.ndarray) -> np.ndarray:
+        """Array form of :meth:`update`; *row* from :meth:`row`."""
+        # Group by instrument, keeping arrival order inside each group.
+        order = np.argsort(row, kind="stable")
+        row, rate, ft, ts = row[order], rate[order], ft[order], ts[order]
+
+        # Builder rules: skip NaN rates; accept a print only if its funding
+        # time beats every earlier one for that instrument (grouped cummax).
+        valid = ~np.isnan(rate)
+        row, rate, ft, ts = row[valid], rate[valid], ft[valid], ts[valid]
+        if len(row) == 0:
+            return np.empty(0, dtype="int64")
+        floor = int(ft.min()) - 1
+        newest = np.nan_to_num(self.data[row, -1, _FUNDING], nan=floor).astype("int64")
+        prev = np.where(self.filled[row] > 0, newest, floor)
+        base = min(floor, int(prev.min()))
+        span = max(int(ft.max()), int(prev.max())) - base + 1
+        seq = np.empty(2 * len(row), dtype="int64")          # prev, ft, prev, ft, … per print
+        seq[0::2] = row * span + (prev - base)
+        seq[1::2] = row * span + (ft - base)
+        running = np.maximum.accumulate(seq)[0::2] - row * span + base  # max before this print
+        keep = ft > np.maximum(running, prev)
+        row, rate, ft, ts = row[keep], rate[keep], ft[keep], ts[keep]
+        if len(row) == 0:
+            return np.empty(0, dtype="int64")
+
+        # New prints per instrument and each print's age (0 = newest).
+        rows, start, count = np.unique(row, return_index=True, return_counts=True)
+        age = np.repeat(start + count, count) - 1 - np.arange(len(row))
+        shift = np.minimum(count, _N_BUCKETS)
+
+        # Shift each touched curve left by its number of new prints …
+        src = np.arange(_N_BUCKETS)[None, :] + shift[:, None]
+        block = np.full((len(rows), _N_BUCKETS, len(FIELDS)), np.nan)
+        inside = src < _N_BUCKETS
+        old = self.data[rows]
+        block[inside] = old[np.nonzero(inside)[0], src[inside]]
+        # … and drop the newest prints into the freed tail.
+        recent = age < _N_BUCKETS
+        grp = np.repeat(np.arange(len(rows)), count)[recent]
+        slot = _N_BUCKETS - 1 - age[recent]
+        block[grp, slot, _RATE] = rate[recent]
+        block[grp, slot, _FUNDING] = ft[recent]
+        block[grp, slot, _TS] = ts[recent]
+
+        self.data[rows] = block
+        self.filled[rows] = np.minimum(self.filled[rows] + count, _N_BUCKETS)
+        return rows[self.filled[rows] == _N_BUCKETS]
+
+    # ------------------------------------------------------------------
+    # Cross‑sectional views
+    # ------------------------------------------------------------------
+    def complete(self) -> np.ndarray:
+        """Rows whose eight buckets are all filled."""
+        return np.flatnonzero(self.filled[: len(self._keys)] == _N_BUCKETS)
+
+    def snapshot(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Tidy 8‑rows‑per‑instrument frame (builder columns) for *rows*
+        (default: every complete curve)."""
+        rows = self.complete() if rows is None else np.asarray(rows, dtype="int64")
+        block = self.data[rows]                                     # (m, 8, fields)
+        m = len(rows)
+        raw = block[:, :, _RATE].ravel()
+        keys = [self._keys[r] for r in rows]
+        return pd.DataFrame(
+            {
+                "exchange": np.repeat([k[0] for k in keys], _N_BUCKETS),
+                "symbol": np.repeat([k[1] for k in keys], _N_BUCKETS),
+                "ts_snap": pd.to_datetime(block[:, :, _TS].ravel().astype("int64"), unit="ms", utc=True),
+                "bucket_start_h": np.tile(np.arange(0, _N_BUCKETS * 8, 8), m),
+                "bucket_end_h": np.tile(np.arange(8, (_N_BUCKETS + 1) * 8, 8), m),
+                "fwd_rate_ann": (1 + raw) ** _ANNUALISE - 1,
+                "raw_rate": raw,
+                "funding_time": pd.to_datetime(block[:, :, _FUNDING].ravel().astype("int64"), unit="ms", utc=True),
+            }
+        )
+
+    def curves(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Annualised curves, one row per instrument: (exchange, symbol) × ``b_*``."""
+        rows = self.complete() if rows is None else np.asarray(rows, dtype="int64")
+        ann = (1 + self.data[rows, :, _RATE]) ** _ANNUALISE - 1
+        index = pd.MultiIndex.from_tuples([self._keys[r] for r in rows], names=["exchange", "symbol"])
+        return pd.DataFrame(ann, index=index, columns=BUCKET_COLS)
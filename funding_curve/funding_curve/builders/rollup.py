@@ -0,0 +1,208 @@
+# =============================================================
+# FILE: funding_curve/builders/rollup.py
+# =============================================================
+"""Multi‑resolution rollups of high‑frequency curve snapshots.
+
+With ``FundingCurveBuilder(emit_on_roll=False)`` each venue emits a curve
+at ~1–10 Hz — far more than most queries need (the README target is a
+10‑minute cadence).  ``CurveRollup`` downsamples incrementally as
+snapshots stream in:
+
+* **Tiers** – 1 s, 1 min and 10 min windows.  Per (exchange, symbol,
+  window) and per bucket it keeps *last*, *mean*, *min* and *max* of the
+  annualised forward rate, plus the snapshot count ``n``.
+* **Cascade** – only the 1 s tier sees raw snapshots; when a 1 s window
+  closes its accumulator is merged into the 1 min one, and so on.  No raw
+  data is ever re‑read.
+* **Retention** – each tier has its own retention and the raw snapshot
+  file can be given one (``RAW_RETENTION_H``); :func:`apply_retention`
+  expires older rows (whole snapshots for the raw file), so raw
+  high‑frequency data can be dropped once it is rolled up.
+
+Closed windows queue up per tier; :meth:`CurveRollup.drain` hands them
+out as ``ROLLUP_SCHEMA`` frames in batches so parquet appends stay
+coarse; :meth:`CurveRollup.close_before` closes windows that ended on a
+timer.  Call :meth:`CurveRollup.flush` on shutdown to close open windows
+(a restart inside the same window then yields a second, partial row for
+it — readers should combine rows sharing ``ts_window``).
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from funding_curve.storage.db import expire_before
+from funding_curve.storage.schemas import BUCKET_COLS, CURVE_LONG_SCHEMA, ROLLUP_SCHEMA
+
+__all__ = ["Tier", "TIERS", "RAW_RETENTION", "CurveRollup", "apply_retention"]
+
+_N_BUCKETS = len(BUCKET_COLS)
+_Key = Tuple[str, str]  # (exchange, symbol)
+
+
+@dataclass(frozen=True)
+class Tier:
+    name: str
+    width_ms: int
+    retention: Optional[timedelta]  # None → keep forever
+
+    @property
+    def path(self) -> Path:
+        return Path(f"storage/processed/curve_rollup_{self.name}.parquet")
+
+
+# Finest first: each tier cascades into the next.
+TIERS: Tuple[Tier, ...] = (
+    Tier("1s", 1_000, timedelta(days=2)),
+    Tier("1min", 60_000, timedelta(days=90)),
+    Tier("10min", 600_000, None),
+)
+# Raw snapshots feed feature_build, so expiring them is opt‑in (hours).
+RAW_RETENTION: Optional[timedelta] = (
+    timedelta(hours=float(os.environ["RAW_RETENTION_H"])) if os.getenv("RAW_RETENTION_H") else None
+)
+
+
+class _Acc:
+    """Running last / sum / min / max of one window's bucket vectors."""
+
+    __slots__ = ("window", "n", "sum", "min", "max", "last")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.n = 0
+        self.sum = np.zeros(_N_BUCKETS)
+        self.min = np.full(_N_BUCKETS, np.inf)
+        self.max = np.full(_N_BUCKETS, -np.inf)
+        self.last = np.full(_N_BUCKETS, np.nan)
+
+    def add(self, values: np.ndarray) -> None:
+        self.n += 1
+        self.sum += values
+        np.minimum(self.min, values, out=self.min)
+        np.maximum(self.max, values, out=self.max)
+        self.last = values
+
+    def merge(self, other: "_Acc") -> None:
+        """Fold a *later*, finer‑grained window into this one."""
+        self.n += other.n
+        self.sum += other.sum
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        self.last = other.last
+
+    def row(self, key: _Key) -> dict:
+        row = {"exchange": key[0], "symbol": key[1], "ts_window": self.window, "n": self.n}
+        mean = self.sum / self.n
+        for stat, vec in (("last", self.last), ("mean", mean), ("min", self.min), ("max", self.max)):
+            row.update({f"{stat}_{c}": v for c, v in zip(BUCKET_COLS, vec)})
+        return row
+
+
+class CurveRollup:
+    """Incrementally maintains the rollup tiers for every (exchange, symbol)."""
+
+    def __init__(self, tiers: Tuple[Tier, ...] = TIERS) -> None:
+        self.tiers = tiers
+        self._open: List[Dict[_Key, _Acc]] = [{} for _ in tiers]
+        self._closed: List[List[dict]] = [[] for _ in tiers]
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    def update(self, snap: pd.DataFrame) -> None:
+        """Feed one tidy 8‑row snapshot from :class:`FundingCurveBuilder`."""
+        snap = snap.sort_values("bucket_start_h")
+        ts_ms = int(pd.DatetimeIndex(snap["ts_snap"]).as_unit("ms").asi8.max())
+        key = (str(snap["exchange"].iloc[0]), str(snap["symbol"].iloc[0]))
+        self.update_curve(key, ts_ms, snap["fwd_rate_ann"].to_numpy(dtype="float64"))
+
+    def update_curve(self, key: _Key, ts_ms: int, values: np.ndarray) -> None:
+        """Hot path: one curve (8 annualised buckets) observed at *ts_ms*."""
+        tier = self.tiers[0]
+        window = ts_ms - ts_ms % tier.width_ms
+        acc = self._open[0].get(key)
+        if acc is None or window > acc.window:
+            if acc is not None:
+                self._close(0, key, acc)
+            acc = self._open[0][key] = _Acc(window)
+        elif window < acc.window:
+            return  # late snapshot for an already‑closed window
+        acc.add(values)
+
+    def _close(self, level: int, key: _Key, acc: _Acc) -> None:
+        self._closed[level].append(acc.row(key))
+        if level + 1 == len(self.tiers):
+            return
+        tier = self.tiers[level + 1]
+        window = acc.window - acc.window % tier.width_ms
+        parent = self._open[level + 1].get(key)
+        if parent is None or window > parent.window:
+            if parent is not None:
+                self._close(level + 1, key, parent)
+            parent = self._open[level + 1][key] = _Acc(window)
+        parent.merge(acc)
+
+    def close_before(self, ts_ms: int) -> None:
+        """Close open windows that ended at or before *ts_ms* (finest first).
+
+        With ``emit_on_roll=True`` snapshots arrive hours apart, so windows
+        would otherwise stay open until the next one; the live loop calls
+        this on a timer with the wall clock.
+        """
+        for level, tier in enumerate(self.tiers):
+            for key, acc in list(self._open[level].items()):
+                if acc.window + tier.width_ms <= ts_ms:
+                    del self._open[level][key]
+                    self._close(level, key, acc)
+
+    def flush(self) -> None:
+        """Close every open window (finest first, so closes cascade)."""
+        for level in range(len(self.tiers)):
+            for key, acc in list(self._open[level].items()):
+                self._close(level, key, acc)
+            self._open[level].clear()
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def drain(self, tier: Tier, min_rows: int = 1) -> Optional[pd.DataFrame]:
+        """Closed rows of *tier* as a frame, once at least *min_rows* queued."""
+        level = self.tiers.index(tier)
+        rows = self._closed[level]
+        if not rows or len(rows) < min_rows:
+            return None
+        self._closed[level] = []
+        df = pd.DataFrame(rows)
+        df["ts_window"] = pd.to_datetime(df["ts_window"], unit="ms", utc=True)
+        return df
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+
+def apply_retention(
+    raw_path: Path,
+    *,
+    tiers: Tuple[Tier, ...] = TIERS,
+    raw_retention: Optional[timedelta] = RAW_RETENTION,
+    now: Optional[pd.Timestamp] = None,
+) -> Dict[str, int]:
+    """Expire rows past each tier's retention; return rows removed per file."""
+    now = pd.Timestamp.now(tz="UTC") if now is None else now
+    removed: Dict[str, int] = {}
+    if raw_retention is not None:
+        removed["raw"] = expire_before(raw_path, CURVE_LONG_SCHEMA, now - raw_retention, snapshots=True)
+    for tier in tiers:
+        if tier.retention is not None:
+            removed[tier.name] = expire_before(
+                tier.path, ROLLUP_SCHEMA, now - tier.retention, ts_col="ts_window"
+            )
+    return removed
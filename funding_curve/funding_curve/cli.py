@@ -0,0 +1,156 @@
+"""funding_curve/cli.py
+
+Single ``funding-curve`` entry point for every pipeline:
+
+    funding-curve ingest --start 2021-01-01   # long REST back‑fill
+    funding-curve live                        # live snapshot loop
+    funding-curve features [--chunked]        # rebuild feature_store.parquet
+    funding-curve compact                     # retention + rewrite parquet files
+    funding-curve bench [imports decode …]    # hot‑path / import‑time benchmarks
+    funding-curve query binance --at 2025-05-05T12:00Z
+
+Only ``argparse`` is imported at module load; pandas, aiohttp, sklearn,
+yfinance … are imported inside the subcommand that needs them, so
+``--help`` and dispatch stay fast.  ``funding-curve bench imports`` checks
+this module against ``CLI_IMPORT_BUDGET_MS``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+__all__ = ["main"]
+
+DEFAULT_START = "2021-01-01"
+
+
+# ---------------------------------------------------------------------------
+# Subcommands (heavy imports live here)
+# ---------------------------------------------------------------------------
+
+def _ingest(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from funding_curve.pipelines.ingest import main as ingest_main
+
+    asyncio.run(ingest_main(args.start))
+    return 0
+
+
+def _live(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from funding_curve.pipelines.snapshot import main as live_main
+
+    try:
+        asyncio.run(live_main())
+    except KeyboardInterrupt:
+        print("\n↯ stopped by user")
+    return 0
+
+
+def _features(args: argparse.Namespace) -> int:
+    from funding_curve import feature_build as fb
+
+    if args.chunked:
+        window_days = args.window_days or fb.CHUNK_DAYS
+        n = fb.build_feature_store_chunked(workers=args.workers, window_days=window_days)
+        print(f"✅ feature_store written → {fb.DST_FEATURE}  ({n:,} rows, chunked)")
+    else:
+        fb.build_feature_store()
+    return 0
+
+
+def _compact(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from funding_curve.builders.rollup import TIERS, apply_retention
+    from funding_curve.pipelines.snapshot import SNAP_PATH
+    from funding_curve.storage.migrate import migrate_file
+
+    removed = apply_retention(SNAP_PATH)
+    print(f"retention: {removed}")
+    paths = [Path(p) for p in args.paths] or [
+        Path("storage/processed/curve_history.parquet"),
+        SNAP_PATH,
+        *(tier.path for tier in TIERS),
+    ]
+    for path in paths:
+        if path.exists():
+            migrate_file(path)  # one schema‑conformed rewrite → bounded row groups
+    return 0
+
+
+def _bench(args: argparse.Namespace) -> int:
+    from funding_curve.bench import run
+
+    return run(args.names)
+
+
+def _query(args: argparse.Namespace) -> int:
+    import pandas as pd
+
+    from funding_curve.storage.query import DEFAULT_SOURCES, CurveStore
+
+    store = CurveStore(args.paths or DEFAULT_SOURCES)
+    if args.start or args.end:
+        start = args.start or pd.Timestamp(0, tz="UTC")
+        end = args.end or pd.Timestamp.now(tz="UTC")
+        out = store.range(start, end, args.exchange, args.symbol)
+    else:
+        out = store.at(args.at or pd.Timestamp.now(tz="UTC"), args.exchange, args.symbol).to_frame().T
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(out)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="funding-curve", description="Funding‑rate term‑structure toolkit")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    p = sub.add_parser("ingest", help="back‑fill curve history from REST")
+    p.add_argument("--start", default=os.getenv("START_DATE", DEFAULT_START), help="YYYY‑MM‑DD")
+    p.set_defaults(func=_ingest)
+
+    p = sub.add_parser("live", help="run the live snapshot loop")
+    p.set_defaults(func=_live)
+
+    p = sub.add_parser("features", help="build the feature store")
+    p.add_argument("--chunked", action="store_true", help="out‑of‑core build for large histories")
+    p.add_argument("--workers", type=int, default=None, help="process‑pool size (default: CPU count)")
+    p.add_argument("--window-days", type=int, default=None, help="ts_snap window per partition")
+    p.set_defaults(func=_features)
+
+    p = sub.add_parser("compact", help="apply retention and rewrite parquet files (stop `live` first)")
+    p.add_argument("paths", nargs="*", help="files to rewrite (default: curve + rollup files)")
+    p.set_defaults(func=_compact)
+
+    p = sub.add_parser("bench", help="hot‑path and import‑time benchmarks")
+    p.add_argument("names", nargs="*", metavar="NAME", help="imports, decode, builder, rollup, engine (default: all)")
+    p.set_defaults(func=_bench)
+
+    p = sub.add_parser("query", help="as‑of curve lookup")
+    p.add_argument("exchange")
+    p.add_argument("--symbol", default=None)
+    p.add_argument("--at", default=None, help="as‑of time (default: now)")
+    p.add_argument("--start", default=None, help="range start (with --end)")
+    p.add_argument("--end", default=None, help="range end")
+    p.add_argument("--paths", nargs="+", default=None, help="long curve files (default: history + live)")
+    p.set_defaults(func=_query)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
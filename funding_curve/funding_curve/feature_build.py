@@ -7,15 +7,33 @@ funding‑curve snapshots.  This version hardens numerical stability:
 • Winsorise raw bucket array ±5 σ *before* PCA to stop overflow.
 • Drop rows with any non‑finite bucket post‑winsorisation.
 • Standardise buckets (mean‑0, sd‑1) before PCA for scale invariance.
+• Snapshots are read / the store is written through the explicit
+  storage schemas (``storage.schemas``).
+• ``--chunked`` out‑of‑core build for long tick‑level histories: the long
+  snapshots are processed in ``ts_snap`` windows across a process pool,
+  global statistics (winsor bounds, scaler, PCA) come from mergeable
+  moments, and peak memory is bounded by *(workers + 1) × window* (plus
+  one ``PARQUET_ROW_GROUP_ROWS`` row group per reader; files written
+  before row groups were bounded need one ``funding-curve compact``).
+• sklearn and yfinance are imported inside the functions that use them,
+  so importing this module (e.g. from the ``funding-curve`` CLI) stays cheap.
 """
 from __future__ import annotations
 
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
 import numpy as np
 import pandas as pd
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-import yfinance as yf
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from funding_curve.storage.db import append_parquet, read_between, read_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, FEATURE_SCHEMA
 
 SRC_HISTORY = Path("storage/processed/curve_history.parquet")
 SRC_LIVE    = Path("storage/processed/curve_live.parquet")
@@ -23,6 +41,7 @@ DST_FEATURE = Path("notebooks/storage/processed/feature_store.parquet")
 
 BUCKET_COLS = [f"b_{h}" for h in range(0, 64, 8)]
 WINSOR_Z    = 5.0   # clip buckets to ±5 σ before PCA
+CHUNK_DAYS  = 30    # ts_snap window per partition in the chunked build
 
 # ---------------------------------------------------------------------
 # Data loading helpers
@@ -30,9 +49,9 @@ WINSOR_Z    = 5.0   # clip buckets to ±5 σ before PCA
 
 def load_curve_long() -> pd.DataFrame:
     """Concatenate historical + live snapshot parquet files."""
-    df = pd.read_parquet(SRC_HISTORY, engine="fastparquet")
+    df = read_parquet(SRC_HISTORY, CURVE_LONG_SCHEMA)
     if SRC_LIVE.exists():
-        df_live = pd.read_parquet(SRC_LIVE, engine="fastparquet")
+        df_live = read_parquet(SRC_LIVE, CURVE_LONG_SCHEMA)
         df = pd.concat([df, df_live], ignore_index=True)
     return df
 
@@ -49,6 +68,7 @@ def pivot_wide(df_long: pd.DataFrame, *, agg: str = "last") -> pd.DataFrame:
             columns="bucket_start_h",
             values="fwd_rate_ann",
             aggfunc=agg,                            # resolves duplicates
+            observed=True,                          # categorical exchange
         )
         .rename(columns=lambda h: f"b_{int(h)}")
         .sort_index()
@@ -79,22 +99,53 @@ def _winsorise(arr: np.ndarray, z: float = WINSOR_Z) -> np.ndarray:
     return np.clip(arr, lo, hi, out=arr)
 
 
-def attach_price(df: pd.DataFrame) -> pd.DataFrame:
-    start = df.index.min().strftime("%Y-%m-%d")
-    end   = (df.index.max() + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+def _download_closes(first: pd.Timestamp, last: pd.Timestamp) -> pd.DataFrame:
+    import yfinance as yf
 
-    closes = (
+    start = first.strftime("%Y-%m-%d")
+    end   = (last + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+    return (
         yf.download("BTC-USD", start=start, end=end, progress=False)
         .loc[:, ["Close"]]
         .rename(columns={"Close": "btc_close"})
         .tz_localize("UTC")
     )
+
+
+def attach_price(df: pd.DataFrame) -> pd.DataFrame:
+    closes = _download_closes(df.index.min(), df.index.max())
     df["btc_close"]  = closes.reindex(df.index, method="ffill")
     df["btc_ret_1d"] = df["btc_close"].pct_change().shift(-1)
     return df.dropna(subset=["btc_ret_1d"])
 
 
+def _assign_factors(df: pd.DataFrame, buckets: np.ndarray, pcs: np.ndarray) -> pd.DataFrame:
+    """Attach pointwise engineered factors + PCA scores to *df*."""
+    level  = buckets[:, 0]
+    slope  = buckets[:, -1] - buckets[:, 0]
+
+    # divide‑by‑zero safe decay ratios
+    decay1 = np.divide(buckets[:, 1], buckets[:, 0], out=np.full_like(level, np.nan), where=buckets[:, 0] != 0)
+    decay2 = np.divide(buckets[:, 2], buckets[:, 1], out=np.full_like(level, np.nan), where=buckets[:, 1] != 0)
+
+    convexity = buckets[:, 2] + buckets[:, 5] - 2 * buckets[:, 3]
+
+    df["level"]     = level
+    df["slope"]     = slope
+    df["decay1"]    = decay1
+    df["decay2"]    = decay2
+    df["convexity"] = convexity
+    df["pca1"]      = pcs[:, 0]
+    df["pca2"]      = pcs[:, 1]
+
+    return df
+
+
 def compute_curve_factors(df: pd.DataFrame) -> pd.DataFrame:
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
     buckets = df[BUCKET_COLS].to_numpy(dtype="float64")
 
     # ------------------------------------------------------------------
@@ -115,38 +166,208 @@ def compute_curve_factors(df: pd.DataFrame) -> pd.DataFrame:
     pca   = PCA(n_components=2, svd_solver="full", random_state=42)
     pcs   = pca.fit_transform(buckets_z)
 
-    # ------------------------------------------------------------------
-    # Pointwise engineered factors
-    # ------------------------------------------------------------------
-    level  = buckets[:, 0]
-    slope  = buckets[:, -1] - buckets[:, 0]
+    return _assign_factors(df, buckets, pcs)
 
-    # divide‑by‑zero safe decay ratios
-    decay1 = np.divide(buckets[:, 1], buckets[:, 0], out=np.full_like(level, np.nan), where=buckets[:, 0] != 0)
-    decay2 = np.divide(buckets[:, 2], buckets[:, 1], out=np.full_like(level, np.nan), where=buckets[:, 1] != 0)
+# ---------------------------------------------------------------------
+# Out‑of‑core (chunked) build
+# ---------------------------------------------------------------------
+#
+# Pass 1  pivot each ts_snap window → spill wide rows to a temp dir
+# Pass 2  attach price per window (next window's first close carried in)
+#         → moments for the winsor bounds
+# Pass 3  winsorise + drop non‑finite → moments for scaler / PCA
+# Pass 4  transform each window and append to the feature store
+#
+# Every window is independent once the global parameters are known, so
+# passes run on a process pool.  Pass 1 reads its window with
+# ``read_between`` (row‑group pruning + batch‑wise filtering), so a
+# worker decodes the window plus at most one bounded row group.  Workers exchange only moments and row
+# counts with the parent; frames stay in the spill files, and the parent
+# streams pass‑4 output one window at a time, so peak memory is about
+# (workers + 1) × window.  Moments are merged with Chan's parallel
+# update, so results match the in‑memory path up to summation order.
 
-    convexity = buckets[:, 2] + buckets[:, 5] - 2 * buckets[:, 3]
+@dataclass
+class _Moments:
+    """Mergeable count / mean / co‑moment matrix of the bucket columns."""
 
-    df["level"]     = level
-    df["slope"]     = slope
-    df["decay1"]    = decay1
-    df["decay2"]    = decay2
-    df["convexity"] = convexity
-    df["pca1"]      = pcs[:, 0]
-    df["pca2"]      = pcs[:, 1]
+    n: int
+    mean: np.ndarray
+    m2: np.ndarray
 
-    return df
+    @classmethod
+    def of(cls, x: np.ndarray) -> "_Moments":
+        if len(x) == 0:
+            k = x.shape[1]
+            return cls(0, np.zeros(k), np.zeros((k, k)))
+        mean = x.mean(axis=0)
+        d = x - mean
+        return cls(len(x), mean, d.T @ d)
+
+    def merge(self, other: "_Moments") -> "_Moments":
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.n / n)
+        m2 = self.m2 + other.m2 + np.outer(delta, delta) * (self.n * other.n / n)
+        return _Moments(n, mean, m2)
+
+    @property
+    def var(self) -> np.ndarray:
+        return np.diag(self.m2) / self.n
+
+
+def _merge_all(moms) -> _Moments:
+    total = _Moments.of(np.empty((0, len(BUCKET_COLS))))
+    for m in moms:
+        total = total.merge(m)
+    return total
+
+
+def _time_windows(sources: Sequence[Path], days: int) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Split the overall ts_snap span into half‑open windows of *days*."""
+    lo = hi = None
+    for path in sources:
+        for batch in pq.ParquetFile(path).iter_batches(columns=["ts_snap"]):
+            mm = pc.min_max(batch.column(0)).as_py()
+            if mm["min"] is None:
+                continue
+            lo = mm["min"] if lo is None else min(lo, mm["min"])
+            hi = mm["max"] if hi is None else max(hi, mm["max"])
+    if lo is None:
+        return []
+    edges = pd.date_range(
+        pd.Timestamp(lo).floor("D"), pd.Timestamp(hi) + pd.Timedelta(days=days), freq=f"{days}D"
+    )
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _pivot_window(args) -> Optional[Tuple[Path, pd.Timestamp, pd.Timestamp]]:
+    sources, lo, hi, spill = args
+    frames = [read_between(p, CURVE_LONG_SCHEMA, lo, hi) for p in sources]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return None
+    wide = pivot_wide(pd.concat(frames, ignore_index=True))
+    if wide.empty:
+        return None
+    wide.to_parquet(spill)
+    return spill, wide.index[0], wide.index[-1]
+
+
+def _price_window(args) -> _Moments:
+    spill, closes, next_close = args
+    df = pd.read_parquet(spill)
+    df["btc_close"] = closes.reindex(df.index, method="ffill")
+    nxt = df["btc_close"].shift(-1)
+    nxt.iloc[-1] = next_close           # pct_change().shift(-1) across windows
+    df["btc_ret_1d"] = nxt / df["btc_close"] - 1
+    df = df.dropna(subset=["btc_ret_1d"])
+    df.to_parquet(spill)
+    return _Moments.of(df[BUCKET_COLS].to_numpy(dtype="float64"))
+
+
+def _clipped(df: pd.DataFrame, lo: np.ndarray, hi: np.ndarray) -> Tuple[pd.DataFrame, np.ndarray]:
+    buckets = np.clip(df[BUCKET_COLS].to_numpy(dtype="float64"), lo, hi)
+    mask_finite = np.isfinite(buckets).all(axis=1)
+    return df.loc[mask_finite].copy(), buckets[mask_finite]
+
+
+def _scale_window(args) -> _Moments:
+    spill, lo, hi = args
+    _, buckets = _clipped(pd.read_parquet(spill), lo, hi)
+    return _Moments.of(buckets)
+
+
+def _factor_window(args) -> int:
+    """Transform one window in place (spill → feature rows); return row count.
+
+    The frame goes back to disk rather than to the parent, so finished
+    windows never pile up in the parent while it appends serially.
+    """
+    spill, lo, hi, mean, scale, components = args
+    df, buckets = _clipped(pd.read_parquet(spill), lo, hi)
+    pcs = ((buckets - mean) / scale) @ components.T
+    df = _assign_factors(df, buckets, pcs)
+    df.to_parquet(spill)
+    return len(df)
+
+
+def _winsor_bounds(mom: _Moments, z: float = WINSOR_Z) -> Tuple[np.ndarray, np.ndarray]:
+    """Global ±z σ bounds; ±inf (no‑op) wherever :func:`_winsorise` would skip."""
+    mu, std = mom.mean, np.sqrt(mom.var)
+    skip = (std == 0) | ~np.isfinite(std) | ~np.isfinite(mu)
+    lo = np.where(skip, -np.inf, mu - z * std)
+    hi = np.where(skip, np.inf, mu + z * std)
+    return lo, hi
+
+
+def _scaler_pca(mom: _Moments, n_components: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """StandardScaler + PCA(svd_solver="full") parameters from moments."""
+    scale = np.sqrt(mom.var)
+    scale[scale == 0] = 1.0             # StandardScaler leaves constant columns as‑is
+    cov_z = (mom.m2 / mom.n) / np.outer(scale, scale)
+    eigvals, eigvecs = np.linalg.eigh(cov_z)
+    order = np.argsort(eigvals)[::-1][:n_components]
+    components = eigvecs[:, order].T
+    # sklearn's svd_flip(u_based_decision=False): largest |loading| positive
+    signs = np.sign(components[np.arange(n_components), np.abs(components).argmax(axis=1)])
+    return mom.mean, scale, components * signs[:, None]
 
 # ---------------------------------------------------------------------
 # Main entry point
 # ---------------------------------------------------------------------
 
+def build_feature_store_chunked(*, workers: Optional[int] = None, window_days: int = CHUNK_DAYS) -> int:
+    """Out‑of‑core equivalent of :func:`build_feature_store`; returns rows written."""
+    sources = [SRC_HISTORY] + ([SRC_LIVE] if SRC_LIVE.exists() else [])
+    windows = _time_windows(sources, window_days)
+
+    with tempfile.TemporaryDirectory(prefix="feature_build_") as tmp, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        # Pass 1 – pivot ------------------------------------------------
+        jobs  = [(sources, lo, hi, Path(tmp) / f"w{i:05d}.parquet") for i, (lo, hi) in enumerate(windows)]
+        parts = [p for p in pool.map(_pivot_window, jobs) if p is not None]
+        if not parts:
+            raise ValueError("no complete curve snapshots in sources")
+        spills = [spill for spill, _, _ in parts]
+
+        # Pass 2 – price + winsor bounds --------------------------------
+        closes = _download_closes(parts[0][1], parts[-1][2])
+        firsts = closes.reindex([first for _, first, _ in parts[1:]], method="ffill")
+        next_close = list(firsts.to_numpy(dtype="float64").ravel()) + [np.nan]
+        lo, hi = _winsor_bounds(
+            _merge_all(pool.map(_price_window, [(s, closes, nc) for s, nc in zip(spills, next_close)]))
+        )
+
+        # Pass 3 – scaler / PCA -----------------------------------------
+        mean, scale, components = _scaler_pca(
+            _merge_all(pool.map(_scale_window, [(s, lo, hi) for s in spills]))
+        )
+
+        # Pass 4 – transform (workers rewrite spills) + stream appends ----
+        rows = 0
+        jobs = [(s, lo, hi, mean, scale, components) for s in spills]
+        for spill, n in zip(spills, pool.map(_factor_window, jobs)):
+            if n == 0:
+                continue
+            df_feat = pd.read_parquet(spill)
+            append_parquet(
+                df_feat.reset_index(), DST_FEATURE, FEATURE_SCHEMA, overwrite=rows == 0, index="ts_snap"
+            )
+            rows += len(df_feat)
+    return rows
+
+
 def build_feature_store() -> None:
     df_wide = pivot_wide(load_curve_long())
     df_wide = attach_price(df_wide)
     df_feat = compute_curve_factors(df_wide)
 
-    df_feat.to_parquet(DST_FEATURE, engine="fastparquet", compression="snappy")
+    append_parquet(df_feat.reset_index(), DST_FEATURE, FEATURE_SCHEMA, overwrite=True, index="ts_snap")
     print(
         f"✅ feature_store written → {DST_FEATURE}  "
         f"({len(df_feat):,} rows, {len(df_feat.columns)} columns)"
@@ -154,4 +375,14 @@ def build_feature_store() -> None:
 
 
 if __name__ == "__main__":
-    build_feature_store()
+    parser = argparse.ArgumentParser(description="Build the curve feature store")
+    parser.add_argument("--chunked", action="store_true", help="out‑of‑core build for large histories")
+    parser.add_argument("--workers", type=int, default=None, help="process‑pool size (default: CPU count)")
+    parser.add_argument("--window-days", type=int, default=CHUNK_DAYS, help="ts_snap window per partition")
+    args = parser.parse_args()
+
+    if args.chunked:
+        n = build_feature_store_chunked(workers=args.workers, window_days=args.window_days)
+        print(f"✅ feature_store written → {DST_FEATURE}  ({n:,} rows, chunked)")
+    else:
+        build_feature_store()
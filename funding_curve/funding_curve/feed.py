@@ -0,0 +1,196 @@
+"""funding_curve/feed.py
+
+Local pub/sub feed of live curve snapshots.
+
+Polling ``curve_live.parquet`` is slow and racy while the snapshot loop
+is appending to it.  Instead, the loop publishes every new snapshot over
+a Unix domain socket and model processes on the same host subscribe:
+
+* **Publisher** (:class:`CurvePublisher`) – runs inside
+  ``pipelines/snapshot.py``; each snapshot is encoded **once** as an Arrow
+  IPC stream (``CURVE_LONG_SCHEMA``) and the same bytes are written to
+  every client without awaiting, so a slow client never stalls the loop
+  (it is dropped once its buffer exceeds ``MAX_CLIENT_BUFFER``).
+* **Client** (:func:`subscribe`, :func:`latest`) – on connect the
+  publisher first sends the *current curve* (latest snapshot of every
+  exchange/symbol), then one frame per new snapshot.
+
+Wire format, per frame::
+
+    uint32 big‑endian length | 1‑byte kind | Arrow IPC stream (length‑1 bytes)
+
+``kind`` is ``b"C"`` (current curve) or ``b"S"`` (new snapshot).
+
+Usage from a model process:
+
+```python
+from funding_curve.feed import subscribe
+
+async for kind, table in subscribe():
+    df = table.to_pandas()
+```
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, to_table
+
+__all__ = [
+    "FEED_PATH",
+    "KIND_CURVE",
+    "KIND_SNAPSHOT",
+    "CurvePublisher",
+    "subscribe",
+    "latest",
+]
+
+FEED_PATH = os.getenv("CURVE_FEED_SOCKET", "storage/curve_feed.sock")
+MAX_CLIENT_BUFFER = 8 * 1024 * 1024   # bytes queued before a client is dropped
+
+KIND_CURVE    = "C"
+KIND_SNAPSHOT = "S"
+
+_HEADER = struct.Struct(">IB")
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _encode(kind: str, table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    body = sink.getvalue()
+    return _HEADER.pack(body.size + 1, ord(kind)) + body.to_pybytes()
+
+
+def _decode(body: bytes) -> pa.Table:
+    return pa.ipc.open_stream(body).read_all()
+
+
+# ---------------------------------------------------------------------------
+# Publisher
+# ---------------------------------------------------------------------------
+
+class CurvePublisher:
+    """Broadcast curve snapshots to local subscribers over a Unix socket."""
+
+    def __init__(self, path: str | os.PathLike = FEED_PATH) -> None:
+        self.path = Path(path)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._current: Dict[Tuple[str, str], pa.Table] = {}
+
+    async def __aenter__(self) -> "CurvePublisher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()  # stale socket from a previous run
+        self._server = await asyncio.start_unix_server(self._on_connect, path=str(self.path))
+        logger.info("curve feed listening on {}", self.path)
+
+    async def close(self) -> None:
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        # Connection handlers wait on reader.read(); end them here rather
+        # than leaving them to be cancelled (with tracebacks) at loop exit.
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        self._handlers.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.path.exists():
+            self.path.unlink()
+
+    # ------------------------------------------------------------------
+    def current(self) -> pa.Table:
+        """Latest snapshot of every (exchange, symbol), as one table."""
+        if not self._current:
+            return CURVE_LONG_SCHEMA.empty_table()
+        return pa.concat_tables(self._current.values())
+
+    def publish(self, snap: pd.DataFrame) -> None:
+        """Record *snap* as the current curve for its venue and broadcast it.
+
+        Synchronous on purpose: frames go straight into each transport's
+        buffer, so publishing never yields to the event loop.  The Arrow
+        table is built directly from the frame's arrays (sub‑ms for 8 rows).
+        """
+        table = to_table(snap, CURVE_LONG_SCHEMA)
+        key = (str(snap["exchange"].iloc[0]), str(snap["symbol"].iloc[0]))
+        self._current[key] = table
+        if self._clients:
+            self._broadcast(_encode(KIND_SNAPSHOT, table))
+
+    def _broadcast(self, frame: bytes) -> None:
+        for writer in list(self._clients):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                logger.warning("curve feed: dropping slow/closed subscriber")
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        writer.write(_encode(KIND_CURVE, self.current()))
+        self._clients.add(writer)
+        try:
+            await reader.read()  # subscribers never send; returns on disconnect
+        except (asyncio.CancelledError, ConnectionError):
+            pass  # publisher closing / subscriber vanished
+        finally:
+            self._clients.discard(writer)
+            self._handlers.discard(task)
+            writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+async def subscribe(path: str | os.PathLike = FEED_PATH) -> AsyncIterator[Tuple[str, pa.Table]]:
+    """Yield ``(kind, table)`` frames: the current curve first, then snapshots."""
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(_HEADER.size)
+            except asyncio.IncompleteReadError:
+                return  # publisher went away
+            size, kind = _HEADER.unpack(header)
+            body = await reader.readexactly(size - 1)
+            yield chr(kind), _decode(body)
+    finally:
+        writer.close()
+
+
+async def latest(path: str | os.PathLike = FEED_PATH) -> pa.Table:
+    """One‑shot: connect, return the current curve, disconnect."""
+    feed = subscribe(path)
+    try:
+        _, table = await feed.__anext__()
+        return table
+    finally:
+        await feed.aclose()
@@ -6,6 +6,13 @@ This single module contains:
 - Concrete BinanceCollector and BybitCollector implementations that satisfy:
     * Async WebSocket streaming of *predicted* 8‑hour funding prints in real‑time (≤1 s latency)
     * REST back‑fill of realised funding history for any gap
+- ConnectionManager: process‑wide, keep‑alive aiohttp sessions (DNS cache,
+  per‑host limits for REST; a separate, unlimited connector for long‑lived
+  WS streams) shared by every collector
+- ExponentialBackoff: jittered reconnect delays; after a reconnect the stream
+  back‑fills the outage window before resuming live prints
+- Fast decode: WS frames are decoded with msgspec (typed, only the fields we
+  need) or orjson when installed, else stdlib json; prints carry int epoch‑ms
 The collectors yield `FundingPrint` objects that can be piped into the FundingCurveBuilder.
 
 Usage example (run inside an `asyncio` event‑loop):
@@ -25,15 +32,26 @@ import asyncio
 import json
 import logging
 import os
+import random
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import AsyncGenerator, AsyncIterator, Optional
-import websockets
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Union
 
 import aiohttp
 
+from funding_curve.utils.time import from_ms, now_ms, to_ms
+
+try:  # optional fast JSON decoders
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 ###############################################################################
@@ -51,11 +69,127 @@ class Settings:
 
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "10"))  # seconds
 
+    HTTP_LIMIT: int = int(os.getenv("HTTP_LIMIT", "100"))                  # pooled connections, total
+    HTTP_LIMIT_PER_HOST: int = int(os.getenv("HTTP_LIMIT_PER_HOST", "8"))  # … per venue host (REST only)
+    HTTP_KEEPALIVE: float = float(os.getenv("HTTP_KEEPALIVE", "30"))       # idle keep‑alive, seconds
+    DNS_TTL: int = int(os.getenv("DNS_TTL", "300"))                        # resolver cache, seconds
+
+    WS_BACKOFF_BASE: float = float(os.getenv("WS_BACKOFF_BASE", "1.0"))    # first retry ceiling, seconds
+    WS_BACKOFF_CAP: float = float(os.getenv("WS_BACKOFF_CAP", "60.0"))     # max retry ceiling, seconds
+
     SYMBOL: str = os.getenv("FUNDING_SYMBOL", "BTCUSDT")
 
 
 settings = Settings()
 
+###############################################################################
+# CONNECTION MANAGER
+###############################################################################
+
+
+class ConnectionManager:
+    """Process‑wide pool of keep‑alive HTTP / WebSocket connections.
+
+    Every collector shares one REST ``aiohttp.ClientSession`` (hence one
+    ``TCPConnector``): TLS connections to a venue host are reused across
+    REST pages, DNS answers are cached for ``DNS_TTL`` seconds and
+    concurrency per host is capped at ``HTTP_LIMIT_PER_HOST``.
+
+    WebSocket streams hold their connection for their whole life, so they
+    would pin REST slots (and a ninth stream to one host would queue in
+    ``ws_connect`` forever).  They use :meth:`ws` instead: a second session
+    whose connector has no connection limits and no total timeout.
+
+    Both sessions are reference‑counted through :meth:`lease` — opened by
+    the first user, closed when the last one releases it.
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws_session: Optional[aiohttp.ClientSession] = None
+        self._users = 0
+
+    @property
+    def active(self) -> Optional[aiohttp.ClientSession]:
+        """The shared session while at least one lease is held, else None."""
+        return self._session if self._users and self._session and not self._session.closed else None
+
+    def _open(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_LIMIT,
+                limit_per_host=settings.HTTP_LIMIT_PER_HOST,
+                use_dns_cache=True,
+                ttl_dns_cache=settings.DNS_TTL,
+                keepalive_timeout=settings.HTTP_KEEPALIVE,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.API_TIMEOUT),
+            )
+        return self._session
+
+    def ws(self) -> aiohttp.ClientSession:
+        """Session for long‑lived WS streams (call while holding a lease)."""
+        assert self._users, "ws() requires an active lease"
+        if self._ws_session is None or self._ws_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,                       # streams never wait for a slot
+                use_dns_cache=True,
+                ttl_dns_cache=settings.DNS_TTL,
+            )
+            self._ws_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, connect=settings.API_TIMEOUT),
+            )
+        return self._ws_session
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Borrow the shared session for the duration of the block."""
+        self._users += 1
+        try:
+            yield self._open()
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.close()
+
+    async def close(self) -> None:
+        for session in (self._session, self._ws_session):
+            if session is not None and not session.closed:
+                await session.close()
+        self._session = self._ws_session = None
+
+
+connections = ConnectionManager()
+
+###############################################################################
+# FAST DECODE
+###############################################################################
+# Typed msgspec decoding skips building dicts for the fields we ignore;
+# orjson is the next‑best untyped decoder.  All paths accept str or bytes.
+
+json_loads: Callable[[Union[str, bytes]], Any] = orjson.loads if orjson is not None else json.loads
+
+if msgspec is not None:
+
+    class _MarkPrice(msgspec.Struct):
+        r: Union[str, float]  # predicted funding rate
+        T: int                # next funding time (ms)
+
+    class _TickerData(msgspec.Struct):
+        fundingRate: Union[str, float, None] = None
+        nextFundingTime: Union[str, int, None] = None
+
+    class _Ticker(msgspec.Struct):
+        topic: str = ""
+        ts: int = 0
+        data: Union[_TickerData, List[_TickerData], None] = None
+
+    _decode_mark_price = msgspec.json.Decoder(_MarkPrice).decode
+    _decode_ticker = msgspec.json.Decoder(_Ticker).decode
+
 ###############################################################################
 # SHARED DATACLASS & BASE COLLECTOR
 ###############################################################################
@@ -63,30 +197,51 @@ settings = Settings()
 
 @dataclass(slots=True)
 class FundingPrint:
+    """Compact print: timestamps are int epoch‑ms; datetimes on demand."""
+
     exchange: str
     symbol: str
-    ts_snap: datetime  # when prediction observed (UTC)
-    predicted_rate: float  # raw 8‑hour rate (decimal, e.g. 0.0001 = 0.01 %)
-    funding_time: datetime  # scheduled funding timestamp (UTC)
+    ts_snap_ms: int  # when prediction observed (UTC epoch‑ms)
+    predicted_rate: float  # raw 8‑hour rate (decimal, e.g. 0.0001 = 0.01 %)
+    funding_time_ms: int  # scheduled funding timestamp (UTC epoch‑ms)
+
+    @property
+    def ts_snap(self) -> datetime:
+        return from_ms(self.ts_snap_ms)
+
+    @property
+    def funding_time(self) -> datetime:
+        return from_ms(self.funding_time_ms)
 
 
 class FundingCollector(ABC):
     """Abstract interface every venue collector must implement."""
 
+    exchange: str
+
     def __init__(self, symbol: str | None = None):
         self.symbol = symbol or settings.SYMBOL
         self._session: Optional[aiohttp.ClientSession] = None
+        self._stack: Optional[AsyncExitStack] = None
 
     # ---------------------------------------------------------------------
-    # Async context manager helpers
+    # Async context manager helpers (lease the shared session)
     # ---------------------------------------------------------------------
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=settings.API_TIMEOUT))
+        stack = AsyncExitStack()
+        self._session = await stack.enter_async_context(connections.lease())
+        self._stack = stack
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session and not self._session.closed:
-            await self._session.close()
+        stack, self._stack, self._session = self._stack, None, None
+        if stack is not None:
+            await stack.__aexit__(exc_type, exc_val, exc_tb)
+
+    def _http(self) -> aiohttp.ClientSession:
+        session = self._session or connections.active
+        assert session, "Session not initialised. Use `async with` first."
+        return session
 
     # ---------------------------------------------------------------------
     # REST back‑fill (blocking per call)
@@ -102,6 +257,62 @@ class FundingCollector(ABC):
     async def stream_predicted(self) -> AsyncIterator[FundingPrint]:
         """Yield *predicted* 8‑hour funding prints as they arrive."""
 
+    async def _stream_ws(
+        self,
+        url: str,
+        make_parser: Callable[[], Callable[[Union[str, bytes]], Optional[FundingPrint]]],
+        *,
+        heartbeat: float,
+        subscribe: Optional[dict] = None,
+    ) -> AsyncIterator[FundingPrint]:
+        """Reconnecting WS loop shared by the concrete collectors.
+
+        Reconnects forever with :class:`ExponentialBackoff`.  After every
+        reconnect the realised prints for the outage window are back‑filled
+        and yielded (oldest first) before live prints resume.  *make_parser*
+        is called once per connection so parsers can keep per‑connection
+        caches; parsers receive the raw frame and decode it themselves.
+        """
+        backoff = ExponentialBackoff()
+        last_seen: Optional[int] = None  # epoch‑ms of the last live print
+        async with connections.lease():
+            session = connections.ws()
+            while True:
+                try:
+                    async with session.ws_connect(url, heartbeat=heartbeat) as ws:
+                        if subscribe is not None:
+                            await ws.send_json(subscribe)
+                        if last_seen is not None:
+                            for fp in await self._backfill_gap(last_seen):
+                                yield fp
+                        parse = make_parser()
+                        async for msg in ws:
+                            if msg.type != aiohttp.WSMsgType.TEXT:
+                                continue
+                            fp = parse(msg.data)
+                            if fp is None:
+                                continue
+                            backoff.reset()  # only once the feed is actually flowing
+                            last_seen = fp.ts_snap_ms
+                            yield fp
+                    logger.warning("%s WS closed by server", self.exchange)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    logger.warning("%s WS reconnect: %s", self.exchange, err)
+                except Exception as err:
+                    logger.exception("%s WS error: %s", self.exchange, err)
+                await backoff.sleep()
+
+    async def _backfill_gap(self, since_ms: int) -> list[FundingPrint]:
+        """Realised prints for the outage window [since, now], oldest first."""
+        since, now = from_ms(since_ms), from_ms(now_ms())
+        try:
+            prints = await self.backfill_realised(since, now)
+        except Exception as err:
+            logger.warning("%s gap back‑fill %s → %s failed: %s", self.exchange, since, now, err)
+            return []
+        logger.info("%s gap back‑fill %s → %s: %d prints", self.exchange, since, now, len(prints))
+        return sorted(prints, key=lambda p: p.funding_time_ms)
+
 ###############################################################################
 # BINANCE COLLECTOR
 ###############################################################################
@@ -110,20 +321,21 @@ class FundingCollector(ABC):
 class BinanceCollector(FundingCollector):
     """Binance USD‑M perpetual funding collector."""
 
+    exchange: str = "binance"
     _WS_PATH_FMT = "{base}/{channel}"
 
     async def backfill_realised(self, start: datetime, end: datetime) -> list[FundingPrint]:
-        assert self._session, "Session not initialised. Use `async with` or call `setup()` first."
+        session = self._http()
         url = f"{settings.BINANCE_REST_URL}/fapi/v1/fundingRate"
         params = {
             "symbol": self.symbol.upper(),
-            "startTime": int(start.timestamp() * 1000),
-            "endTime": int(end.timestamp() * 1000),
+            "startTime": to_ms(start),
+            "endTime": to_ms(end),
             "limit": 1000,
         }
         prints: list[FundingPrint] = []
         while True:
-            async with self._session.get(url, params=params) as resp:
+            async with session.get(url, params=params) as resp:
                 data = await resp.json()
             if not data:
                 break
@@ -132,9 +344,9 @@ class BinanceCollector(FundingCollector):
                     FundingPrint(
                         exchange="binance",
                         symbol=self.symbol,
-                        ts_snap=datetime.fromtimestamp(item["fundingTime"] / 1000, tz=timezone.utc),
+                        ts_snap_ms=int(item["fundingTime"]),
                         predicted_rate=float(item["fundingRate"]),
-                        funding_time=datetime.fromtimestamp(item["fundingTime"] / 1000, tz=timezone.utc),
+                        funding_time_ms=int(item["fundingTime"]),
                     )
                 )
             # pagination: break because endpoint returns contiguous data when limit≤1000
@@ -146,25 +358,26 @@ class BinanceCollector(FundingCollector):
     async def stream_predicted(self) -> AsyncIterator[FundingPrint]:
         channel = f"{self.symbol.lower()}@markPrice"
         ws_url = self._WS_PATH_FMT.format(base=settings.BINANCE_WS_URL, channel=channel)
-        async for retry in _reconnect():
-            try:
-                async with aiohttp.ClientSession() as ws_session:
-                    async with ws_session.ws_connect(ws_url, heartbeat=60) as ws:
-                        async for msg in ws:
-                            if msg.type != aiohttp.WSMsgType.TEXT:
-                                continue
-                            data = json.loads(msg.data)
-                            fp = FundingPrint(
-                                exchange="binance",
-                                symbol=self.symbol,
-                                ts_snap=datetime.utcnow().replace(tzinfo=timezone.utc),
-                                predicted_rate=float(data["r"]),
-                                funding_time=datetime.fromtimestamp(data["T"] / 1000, tz=timezone.utc),
-                            )
-                            yield fp
-            except Exception as e:
-                logger.exception("Binance WS error: %s", e)
-                await asyncio.sleep(retry)
+        # aclosing: closing this generator must also close the WS loop (and
+        # release its lease) now, not whenever the inner one is collected.
+        async with aclosing(self._stream_ws(ws_url, lambda: self._parse_mark_price, heartbeat=60)) as stream:
+            async for fp in stream:
+                yield fp
+
+    def _parse_mark_price(self, raw: Union[str, bytes]) -> FundingPrint:
+        if msgspec is not None:
+            m = _decode_mark_price(raw)
+            rate, ftime = m.r, m.T
+        else:
+            data = json_loads(raw)
+            rate, ftime = data["r"], data["T"]
+        return FundingPrint(
+            exchange=self.exchange,
+            symbol=self.symbol,
+            ts_snap_ms=now_ms(),
+            predicted_rate=float(rate),
+            funding_time_ms=int(ftime),
+        )
 
 ###############################################################################
 # BYBIT COLLECTOR (v5 public)
@@ -177,18 +390,18 @@ class BybitCollector(FundingCollector):
     exchange: str = "bybit"
 
     async def backfill_realised(self, start: datetime, end: datetime) -> list[FundingPrint]:
-        assert self._session, "Session not initialised. Use `async with` first."
+        session = self._http()
         url = f"{settings.BYBIT_REST_URL}/v5/market/funding/history"
         params = {
             "category": "linear",
             "symbol": self.symbol.upper(),
-            "startTime": int(start.timestamp() * 1000),
-            "endTime": int(end.timestamp() * 1000),
+            "startTime": to_ms(start),
+            "endTime": to_ms(end),
             "limit": 200,
         }
         prints: list[FundingPrint] = []
         while True:
-            async with self._session.get(url, params=params) as resp:
+            async with session.get(url, params=params) as resp:
                 payload = await resp.json()
             rows = payload.get("result", {}).get("list", [])
             if not rows:
@@ -198,9 +411,9 @@ class BybitCollector(FundingCollector):
                     FundingPrint(
                         exchange="bybit",
                         symbol=self.symbol,
-                        ts_snap=datetime.fromtimestamp(int(item["fundingRateTimestamp"]) / 1000, tz=timezone.utc),
+                        ts_snap_ms=int(item["fundingRateTimestamp"]),
                         predicted_rate=float(item["fundingRate"]),
-                        funding_time=datetime.fromtimestamp(int(item["fundingRateTimestamp"]) / 1000, tz=timezone.utc),
+                        funding_time_ms=int(item["fundingRateTimestamp"]),
                     )
                 )
             # Bybit returns data in descending order
@@ -210,66 +423,92 @@ class BybitCollector(FundingCollector):
             params["endTime"] = last_ts - 1
         return prints
 
-    async def stream_predicted(self) -> AsyncGenerator[FundingPrint, None]:
+    async def stream_predicted(self) -> AsyncIterator[FundingPrint]:
         """Yield FundingPrint once per Bybit ticker message (≈ every 100 ms)."""
         url      = settings.BYBIT_WS_URL          # wss://stream.bybit.com/v5/public/linear
         topic    = f"tickers.{self.symbol}"       # e.g. tickers.BTCUSDT
-        timeout  = aiohttp.ClientTimeout(total=settings.API_TIMEOUT)
-
-        async with aiohttp.ClientSession(timeout=timeout) as ws_session:
-            while True:
-                try:
-                    async with ws_session.ws_connect(url, heartbeat=30) as ws:
-                        await ws.send_json({"op": "subscribe", "args": [topic]})
-
-                        latest_rate   = None     # cache fundingRate
-                        latest_ftime  = None     # cache nextFundingTime
-
-                        async for msg in ws:
-                            if msg.type != aiohttp.WSMsgType.TEXT:
-                                continue
-
-                            payload = json.loads(msg.data)
-                            if payload.get("topic") != topic:
-                                continue
 
-                            snap = payload["data"][0] if isinstance(payload["data"], list) else payload["data"]
-
-                            # update cache **only** when key present
-                            if "fundingRate" in snap:
-                                latest_rate  = float(snap["fundingRate"])
-                            if "nextFundingTime" in snap:
-                                latest_ftime = int(snap["nextFundingTime"])
-
-                            # yield only if both cached values are populated
-                            if latest_rate is not None and latest_ftime is not None:
-                                yield FundingPrint(
-                                    exchange=self.exchange,          # "bybit"
-                                    symbol=self.symbol,              # "BTCUSDT"
-                                    ts_snap=datetime.utcfromtimestamp(payload["ts"] / 1000).replace(tzinfo=timezone.utc),
-                                    predicted_rate=latest_rate,
-                                    funding_time=datetime.utcfromtimestamp(latest_ftime / 1000).replace(tzinfo=timezone.utc),
-                                )
-
-                except (aiohttp.ClientError,
-                        asyncio.TimeoutError,
-                        websockets.ConnectionClosed) as err:
-                    logger.warning("Bybit WS reconnect: %s", err)
-                    await asyncio.sleep(3)
-                    continue
+        async with aclosing(self._stream_ws(
+            url,
+            lambda: self._ticker_parser(topic),
+            heartbeat=30,
+            subscribe={"op": "subscribe", "args": [topic]},
+        )) as stream:
+            async for fp in stream:
+                yield fp
+
+    def _ticker_parser(self, topic: str) -> Callable[[Union[str, bytes]], Optional[FundingPrint]]:
+        """Per‑connection parser; ticker deltas omit unchanged keys, so cache them."""
+        latest_rate: Optional[float] = None     # cache fundingRate
+        latest_ftime: Optional[int] = None      # cache nextFundingTime
+
+        def parse(raw: Union[str, bytes]) -> Optional[FundingPrint]:
+            nonlocal latest_rate, latest_ftime
+            if msgspec is not None:
+                msg = _decode_ticker(raw)
+                if msg.topic != topic or msg.data is None:
+                    return None
+                snap = msg.data[0] if isinstance(msg.data, list) else msg.data
+                rate, ftime, ts = snap.fundingRate, snap.nextFundingTime, msg.ts
+            else:
+                payload = json_loads(raw)
+                if payload.get("topic") != topic:
+                    return None
+                snap = payload["data"][0] if isinstance(payload["data"], list) else payload["data"]
+                rate, ftime, ts = snap.get("fundingRate"), snap.get("nextFundingTime"), payload["ts"]
+
+            # update cache **only** when key present
+            if rate is not None:
+                latest_rate  = float(rate)
+            if ftime is not None:
+                latest_ftime = int(ftime)
+
+            # yield only if both cached values are populated
+            if latest_rate is None or latest_ftime is None:
+                return None
+            return FundingPrint(
+                exchange=self.exchange,          # "bybit"
+                symbol=self.symbol,              # "BTCUSDT"
+                ts_snap_ms=int(ts),
+                predicted_rate=latest_rate,
+                funding_time_ms=latest_ftime,
+            )
+
+        return parse
 
 ###############################################################################
 # RECONNECT BACKOFF UTILITY
 ###############################################################################
 
 
-async def _reconnect(max_retries: int = 5, backoff: float = 1.5):
-    """
-    Yields retry-counter and waits with exponential back-off.
+class ExponentialBackoff:
+    """Exponential back‑off with *full jitter* for reconnect loops.
+
+    The n‑th consecutive failure sleeps ``uniform(0, min(cap, base·2ⁿ))``
+    seconds, so many collectors reconnecting after a venue outage spread
+    out instead of stampeding.  Call :meth:`reset` once data flows again.
     """
-    retry = 0
-    while True:
-        yield retry           # << now it's an *async* yield
-        return                #   exit after first pass (or tailor to your logic)
-        # If you want a loop, move the network call into a try/except
-        # and 'continue' when ConnectionClosed is caught.
\ No newline at end of file
+
+    def __init__(
+        self,
+        base: float | None = None,
+        cap: float | None = None,
+        factor: float = 2.0,
+    ) -> None:
+        self.base = settings.WS_BACKOFF_BASE if base is None else base
+        self.cap = settings.WS_BACKOFF_CAP if cap is None else cap
+        self.factor = factor
+        self.attempt = 0
+
+    def reset(self) -> None:
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        ceiling = min(self.cap, self.base * self.factor ** self.attempt)
+        self.attempt += 1
+        return random.uniform(0, ceiling)
+
+    async def sleep(self) -> None:
+        delay = self.next_delay()
+        logger.info("reconnecting in %.1fs (attempt %d)", delay, self.attempt)
+        await asyncio.sleep(delay)
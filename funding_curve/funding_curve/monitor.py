@@ -0,0 +1,257 @@
+"""funding_curve/monitor.py
+
+Event‑loop lag monitor and on‑demand sampling profiler for the live loop.
+
+When ``pipelines/snapshot.py`` falls behind, the question is *what* held
+the loop: WS decoding, ``FundingCurveBuilder.update`` or the blocking
+parquet append.  :class:`LoopMonitor` answers it without a restart:
+
+* **Lag** – a tiny task sleeps ``LOOP_LAG_INTERVAL_MS`` and records how
+  late it wakes up (scheduling delay).  p50 / p99 / max are logged every
+  ``LOOP_REPORT_S`` seconds and available via :meth:`LoopMonitor.stats`.
+* **Slow‑callback stacks** – a watchdog thread notices when that task has
+  not run for ``LOOP_SLOW_MS`` and grabs the loop thread's stack *while it
+  is still blocked*, so the sample points at the culprit rather than at
+  the scheduler.  Distinct stacks are counted and logged once per stall.
+* **Sampling profiler** – ``kill -USR1 <pid>`` or touching the flag file
+  ``PROFILE_FLAG`` samples the loop thread at ``PROFILE_HZ`` for
+  ``PROFILE_SECONDS`` and writes collapsed stacks (``flamegraph.pl`` /
+  speedscope format) to ``PROFILE_DIR``.  No sampler thread exists while
+  idle; the only standing cost is the lag tick and a watchdog wake‑up.
+
+```python
+async with LoopMonitor():
+    await run_pipeline()
+```
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from types import FrameType
+from typing import Deque, Dict, Optional, Tuple
+
+from loguru import logger
+
+__all__ = ["LoopMonitor", "SamplingProfiler"]
+
+LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000  # lag probe period, seconds
+SLOW_AFTER = float(os.getenv("LOOP_SLOW_MS", "250")) / 1000            # stall before sampling a stack
+REPORT_EVERY = float(os.getenv("LOOP_REPORT_S", "60"))                 # lag summary period, seconds
+FLAG_EVERY = 1.0                                                       # flag‑file poll period, seconds
+
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+PROFILE_HZ = float(os.getenv("PROFILE_HZ", "200"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "storage/profiles"))
+PROFILE_FLAG = Path(os.getenv("PROFILE_FLAG", "storage/profile.request"))
+PROFILE_SIGNAL = getattr(signal, "SIGUSR1", None)
+
+_Stack = Tuple[str, ...]  # root → leaf frame labels
+
+
+def _stack(frame: Optional[FrameType]) -> _Stack:
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def _percentile(sorted_vals, q: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+# ---------------------------------------------------------------------------
+# Sampling profiler
+# ---------------------------------------------------------------------------
+
+class SamplingProfiler:
+    """Sample one thread's stack at *hz* for *seconds*; write collapsed stacks."""
+
+    def __init__(self, thread_id: int, *, seconds: float = PROFILE_SECONDS, hz: float = PROFILE_HZ,
+                 out_dir: Path = PROFILE_DIR) -> None:
+        self.thread_id = thread_id
+        self.seconds = seconds
+        self.hz = hz
+        self.out_dir = Path(out_dir)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start a capture in the background; False if one is already running."""
+        if self.running:
+            return False
+        self._thread = threading.Thread(target=self._run, name="funding-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        samples: Counter = Counter()
+        period = 1.0 / self.hz
+        deadline = time.monotonic() + self.seconds
+        logger.info("profiling loop thread for {:.0f}s at {:.0f} Hz", self.seconds, self.hz)
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break  # loop thread exited
+            samples[_stack(frame)] += 1
+            del frame
+            time.sleep(period)
+        path = self.write(samples)
+        logger.info("profile written → {} ({:,} samples)", path, sum(samples.values()))
+
+    def write(self, samples: Counter) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / time.strftime("profile-%Y%m%dT%H%M%S.folded")
+        with open(path, "w") as fh:
+            for stack, n in samples.most_common():
+                fh.write(f"{';'.join(stack)} {n}\n")
+        return path
+
+
+# ---------------------------------------------------------------------------
+# Loop monitor
+# ---------------------------------------------------------------------------
+
+class LoopMonitor:
+    """Lag probe, stall watchdog and profiler trigger for the running loop."""
+
+    def __init__(
+        self,
+        *,
+        interval: float = LAG_INTERVAL,
+        slow_after: float = SLOW_AFTER,
+        report_every: float = REPORT_EVERY,
+        flag: Optional[Path] = PROFILE_FLAG,
+        history: int = 4096,
+    ) -> None:
+        self.interval = interval
+        self.slow_after = slow_after
+        self.report_every = report_every
+        self.flag = Path(flag) if flag is not None else None
+        self.lags: Deque[float] = deque(maxlen=history)   # seconds, most recent last
+        self.slow_stacks: Counter = Counter()             # stack → stalls observed there
+        self.profiler: Optional[SamplingProfiler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id = 0
+        self._beat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._signal = False
+
+    async def __aenter__(self) -> "LoopMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Start the lag task, the watchdog thread and the profile trigger."""
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self.profiler = SamplingProfiler(self._thread_id)
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe(), name="loop-lag-probe")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if PROFILE_SIGNAL is not None:
+            try:
+                self._loop.add_signal_handler(PROFILE_SIGNAL, self.profile)
+                self._signal = True
+            except (NotImplementedError, RuntimeError):  # non‑main thread / Windows
+                pass
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._signal:
+            self._loop.remove_signal_handler(PROFILE_SIGNAL)
+            self._signal = False
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        if self.lags:
+            self._report()
+
+    # ------------------------------------------------------------------
+    def profile(self) -> None:
+        """Trigger a sampled profile capture (signal / flag / manual)."""
+        if self.profiler is not None and not self.profiler.start():
+            logger.warning("profile already in progress – trigger ignored")
+
+    def stats(self) -> Dict[str, float]:
+        """Scheduling‑delay summary over the recent window, in milliseconds."""
+        if not self.lags:
+            return {"n": 0}
+        vals = sorted(self.lags)
+        return {
+            "n": len(vals),
+            "p50_ms": _percentile(vals, 0.50) * 1000,
+            "p99_ms": _percentile(vals, 0.99) * 1000,
+            "max_ms": vals[-1] * 1000,
+            "stalls": sum(self.slow_stacks.values()),
+        }
+
+    def _report(self) -> None:
+        s = self.stats()
+        logger.info(
+            "loop lag p50={:.1f}ms p99={:.1f}ms max={:.1f}ms stalls={}",
+            s["p50_ms"], s["p99_ms"], s["max_ms"], s["stalls"],
+        )
+
+    # ------------------------------------------------------------------
+    async def _probe(self) -> None:
+        last_report = last_flag = time.monotonic()
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self.lags.append(max(0.0, now - expected))
+
+            if now - last_report >= self.report_every:
+                last_report = now
+                self._report()
+            if self.flag is not None and now - last_flag >= FLAG_EVERY:
+                last_flag = now
+                if self.flag.exists():
+                    self.flag.unlink(missing_ok=True)
+                    self.profile()
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop thread's stack while it is stalled."""
+        sampled_beat = None
+        while not self._stop.wait(self.slow_after / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.slow_after + self.interval or beat == sampled_beat:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                return
+            stack = _stack(frame)
+            del frame
+            sampled_beat = beat  # one sample per stall
+            self.slow_stacks[stack] += 1
+            logger.warning(
+                "event loop blocked ≥{:.0f} ms in:\n  {}", stalled * 1000, "\n  ".join(stack[-6:])
+            )
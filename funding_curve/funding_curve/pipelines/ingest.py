@@ -7,7 +7,8 @@ Batch back‑fill of funding‑rate term‑structure history.
 * Feeds them through FundingCurveBuilder to generate an 8‑bucket curve
   snapshot *every time the funding window rolls*.
 * Writes the snapshots to storage/processed/curve_history.parquet
-  using fastparquet (append‑safe) then exits.
+  using fastparquet (append‑safe), conformed to ``CURVE_LONG_SCHEMA``,
+  in batches of ``APPEND_BATCH`` snapshots (one row group each), then exits.
 
 Run once:
 
@@ -29,14 +30,16 @@ from loguru import logger
 
 from funding_curve.builders.curve import FundingCurveBuilder
 from funding_curve.funding_collectors import BinanceCollector, BybitCollector
+from funding_curve.storage.db import append_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA
 
 # ---------------------------------------------------------------------------
 # SETTINGS
 # ---------------------------------------------------------------------------
 DEFAULT_START = "2021-01-01"            # fallback if CLI flag missing
 OUT_PATH      = "storage/processed/curve_history.parquet"
-ENGINE        = "fastparquet"           # matches live pipeline
 CHUNK_HOURS   = 24 * 7                  # one‑week chunks (API safe)
+APPEND_BATCH  = 500                     # snapshots per parquet append (one row group)
 
 
 # ---------------------------------------------------------------------------
@@ -49,7 +52,7 @@ async def _historical_stream(collector, start: datetime, end: datetime) -> Async
         chunk_end = min(cursor + timedelta(hours=CHUNK_HOURS - 1), end)
         prints = await collector.backfill_realised(cursor, chunk_end)
         # backfill_realised returns list (may be empty)
-        for fp in sorted(prints, key=lambda p: p.funding_time):
+        for fp in sorted(prints, key=lambda p: p.funding_time_ms):
             yield fp
         # move cursor one ms past last chunk_end to avoid overlap
         cursor = chunk_end + timedelta(milliseconds=1)
@@ -57,22 +60,22 @@ async def _historical_stream(collector, start: datetime, end: datetime) -> Async
 
 async def _ingest_exchange(name: str, collector_cls, start: datetime, end: datetime, builder: FundingCurveBuilder):
     logger.info(f"[{name}] ingesting {start:%Y-%m-%d} → {end:%Y-%m-%d}")
+    pending: list[pd.DataFrame] = []
     async with collector_cls() as coll:
         async for fp in _historical_stream(coll, start, end):
             snap = builder.update(fp)
             if snap is not None:
-                _append_parquet(snap, OUT_PATH)
+                pending.append(snap)
+                if len(pending) >= APPEND_BATCH:
+                    _append_parquet(pd.concat(pending, ignore_index=True), OUT_PATH)
+                    pending.clear()
+    if pending:
+        _append_parquet(pd.concat(pending, ignore_index=True), OUT_PATH)
     logger.success(f"[{name}] done.")
 
 
 def _append_parquet(df: pd.DataFrame, path: str):
-    df.to_parquet(
-        path,
-        engine=ENGINE,
-        compression="snappy",
-        index=False,
-        append=os.path.exists(path),
-    )
+    append_parquet(df, path, CURVE_LONG_SCHEMA)
 
 
 # ---------------------------------------------------------------------------
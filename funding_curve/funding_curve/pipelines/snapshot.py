@@ -7,11 +7,31 @@
   initial curve into *curve_live.parquet* so historical exploration works
   even if you never ran the big `ingest.py` back‑fill.
 • After seeding, emits one snapshot per 8‑h funding roll per exchange.
+• Both collectors are entered once and share the process‑wide keep‑alive
+  session for seeding *and* streaming; WS drops reconnect with jittered
+  back‑off and back‑fill the outage window (see ``funding_collectors``).
+• Every snapshot (seed and live) is also broadcast on the local curve feed
+  (``funding_curve.feed``, Unix socket ``CURVE_FEED_SOCKET``) so model
+  processes can subscribe instead of polling the parquet file.
+• Every snapshot also feeds the 1 s / 1 min / 10 min rollups
+  (``builders.rollup``); closed windows are appended in batches to
+  *curve_rollup_{tier}.parquet*, and every ``ROLLUP_FLUSH_EVERY`` seconds
+  windows that have ended are closed and written regardless of batch
+  size.  Per‑tier retention runs hourly in a worker thread, holding the
+  write lock so appends wait for the rewrite instead of racing it.
+• ``SIGTERM`` stops the streams like Ctrl‑C: open rollup windows are
+  flushed to disk before exit.
+• ``funding_curve.monitor.LoopMonitor`` logs event‑loop lag, samples the
+  stack of any callback blocking the loop ≥ ``LOOP_SLOW_MS``, and on
+  ``kill -USR1 <pid>`` (or ``touch storage/profile.request``) writes a
+  sampled profile to *storage/profiles/* without restarting.
 """
 from __future__ import annotations
 
 import asyncio
 import os
+import signal
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Optional
@@ -20,25 +40,33 @@ import pandas as pd
 from loguru import logger
 
 from funding_curve.builders.curve import FundingCurveBuilder
+from funding_curve.builders.rollup import CurveRollup, apply_retention
+from funding_curve.feed import CurvePublisher
 from funding_curve.funding_collectors import BinanceCollector, BybitCollector
+from funding_curve.monitor import LoopMonitor
+from funding_curve.storage.db import append_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, ROLLUP_SCHEMA
 
 SNAP_PATH = Path("storage/processed/curve_live.parquet")
-ENGINE    = "fastparquet"  # keep in sync with ingest.py
+ROLLUP_BATCH = 600                  # closed windows per tier before appending
+ROLLUP_FLUSH_EVERY = 60             # seconds between timed rollup writes
+ROLLUP_GRACE_MS = 5_000             # wall‑clock slack before closing a window
+RETENTION_EVERY = 60 * 60           # seconds between retention sweeps
 
 # -----------------------------------------------------------------------------
 # Utils
 # -----------------------------------------------------------------------------
 async def _seed_builder(builder: FundingCurveBuilder, collector, now_utc: datetime) -> Optional[pd.DataFrame]:
     """Pre‑warm builder with last seven realised prints *and* return the first
-    complete curve snapshot so it can be written to disk."""
+    complete curve snapshot so it can be written to disk.  *collector* must
+    already be entered (``async with``)."""
     start = now_utc - timedelta(hours=64 + 1)
     end   = now_utc - timedelta(seconds=1)
 
-    async with collector:
-        prints = await collector.backfill_realised(start, end)
+    prints = await collector.backfill_realised(start, end)
 
     # Keep the **last** 7 events (one per 8‑h bucket)
-    prints = sorted(prints, key=lambda p: p.funding_time)[-7:]
+    prints = sorted(prints, key=lambda p: p.funding_time_ms)[-7:]
 
     snapshot: Optional[pd.DataFrame] = None
     for fp in prints:
@@ -46,22 +74,51 @@ async def _seed_builder(builder: FundingCurveBuilder, collector, now_utc: dateti
     return snapshot
 
 
-async def _pipe(stream, builder):
+async def _pipe(stream, builder, feed: CurvePublisher, rollup: CurveRollup, lock: asyncio.Lock):
     async for fp in stream:
         snap = builder.update(fp)
         if snap is not None:
-            _append_parquet(snap)
+            feed.publish(snap)
+            rollup.update(snap)
+            async with lock:
+                _append_parquet(snap)
+                _write_rollups(rollup, min_rows=ROLLUP_BATCH)
             logger.debug("live snapshot appended: %s / %s", fp.exchange, fp.funding_time)
 
 
 def _append_parquet(df: pd.DataFrame, *, first_write: bool = False):
-    df.to_parquet(
-        SNAP_PATH,
-        engine=ENGINE,
-        compression="snappy",
-        index=False,
-        append=(not first_write and SNAP_PATH.exists()),
-    )
+    append_parquet(df, SNAP_PATH, CURVE_LONG_SCHEMA, overwrite=first_write)
+
+
+def _write_rollups(rollup: CurveRollup, *, min_rows: int = 1):
+    for tier in rollup.tiers:
+        df = rollup.drain(tier, min_rows)
+        if df is not None:
+            append_parquet(df, tier.path, ROLLUP_SCHEMA)
+
+
+async def _flush_loop(rollup: CurveRollup, lock: asyncio.Lock):
+    while True:
+        await asyncio.sleep(ROLLUP_FLUSH_EVERY)
+        rollup.close_before(int(time.time() * 1000) - ROLLUP_GRACE_MS)
+        async with lock:
+            _write_rollups(rollup)
+
+
+async def _retention_loop(lock: asyncio.Lock):
+    while True:
+        async with lock:
+            # Rewrites whole files: keep it off the loop, and keep the lock
+            # until the thread is done even if we are cancelled meanwhile.
+            job = asyncio.ensure_future(asyncio.to_thread(apply_retention, SNAP_PATH))
+            try:
+                removed = await asyncio.shield(job)
+            except asyncio.CancelledError:
+                await job
+                raise
+        if any(removed.values()):
+            logger.info("retention sweep removed {}", removed)
+        await asyncio.sleep(RETENTION_EVERY)
 
 
 # -----------------------------------------------------------------------------
@@ -71,30 +128,60 @@ async def main():
     now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
 
     builder = FundingCurveBuilder()  # emit_on_roll=True by default
+    rollup  = CurveRollup()
     binance = BinanceCollector()
     bybit   = BybitCollector()
+    lock    = asyncio.Lock()  # serialises parquet writes with the retention rewrite
+
+    async with LoopMonitor(), CurvePublisher() as feed, binance, bybit:
+        # 1️⃣  Pre‑warm builder and capture initial snapshots ------------------
+        seed_snaps = await asyncio.gather(
+            _seed_builder(builder, binance, now_utc),
+            _seed_builder(builder, bybit,  now_utc),
+        )
 
-    # 1️⃣  Pre‑warm builder and capture initial snapshots ----------------------
-    seed_snaps = await asyncio.gather(
-        _seed_builder(builder, binance, now_utc),
-        _seed_builder(builder, bybit,  now_utc),
-    )
-
-    # Concatenate any non‑empty seed frames and write once --------------------
-    seed_frames: List[pd.DataFrame] = [s for s in seed_snaps if s is not None]
-    if seed_frames:
-        df_init = pd.concat(seed_frames, ignore_index=True)
-        _append_parquet(df_init, first_write=not SNAP_PATH.exists())
-        logger.success("Initial seeded curve written → %s  (%d rows)", SNAP_PATH, len(df_init))
-    else:
-        logger.warning("No initial snapshot generated during seeding phase.")
-
-    # 2️⃣  Start live streams --------------------------------------------------
-    async with binance, bybit:
-        await asyncio.gather(
-            _pipe(binance.stream_predicted(), builder),
-            _pipe(bybit.stream_predicted(),   builder),
+        # Concatenate any non‑empty seed frames and write once ----------------
+        seed_frames: List[pd.DataFrame] = [s for s in seed_snaps if s is not None]
+        for snap in seed_frames:
+            feed.publish(snap)
+            rollup.update(snap)
+        if seed_frames:
+            df_init = pd.concat(seed_frames, ignore_index=True)
+            _append_parquet(df_init, first_write=not SNAP_PATH.exists())
+            logger.success("Initial seeded curve written → %s  (%d rows)", SNAP_PATH, len(df_init))
+        else:
+            logger.warning("No initial snapshot generated during seeding phase.")
+
+        # 2️⃣  Start live streams ----------------------------------------------
+        live = asyncio.gather(
+            _pipe(binance.stream_predicted(), builder, feed, rollup, lock),
+            _pipe(bybit.stream_predicted(),   builder, feed, rollup, lock),
+            _flush_loop(rollup, lock),
+            _retention_loop(lock),
         )
+        terminated = asyncio.Event()
+
+        def _terminate():
+            logger.warning("SIGTERM – stopping streams and flushing rollups")
+            terminated.set()
+            live.cancel()
+
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, _terminate)
+            handled = True
+        except (NotImplementedError, RuntimeError):  # non‑main thread / Windows
+            handled = False
+        try:
+            await live
+        except asyncio.CancelledError:
+            if not terminated.is_set():
+                raise
+        finally:
+            if handled:
+                loop.remove_signal_handler(signal.SIGTERM)
+            rollup.flush()
+            _write_rollups(rollup)
 
 
 if __name__ == "__main__":
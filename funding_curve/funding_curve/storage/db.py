@@ -0,0 +1,249 @@
+# =============================================================
+# FILE: funding_curve/storage/db.py
+# =============================================================
+"""Schema‑enforcing parquet read / append helpers.
+
+Every pipeline writes through :func:`append_parquet` so frames are
+conformed to the explicit Arrow schema (see :mod:`storage.schemas`)
+before they hit disk.  Appends stay on *fastparquet* (the only engine
+that can append row groups to a single file); reads go through
+*pyarrow*, which is considerably faster on wide scans and decodes the
+plain‑string label columns straight into pandas categories.
+
+Writes are cut into row groups of at most ``PARQUET_ROW_GROUP_ROWS`` rows
+(fastparquet's default is one group per write), so time‑window reads
+(:func:`read_between`) can skip everything outside the window even on a
+freshly compacted file.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from funding_curve.storage.schemas import conform, label_columns
+
+__all__ = [
+    "ENGINE",
+    "SchemaMismatch",
+    "check_schema",
+    "append_parquet",
+    "read_parquet",
+    "read_between",
+    "snapshot_runs",
+    "expire_before",
+]
+
+ENGINE = "fastparquet"  # append‑capable writer shared by ingest / snapshot
+ROW_GROUP_ROWS = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "131072"))
+READ_BATCH_ROWS = 65_536  # batch size for streamed window reads
+
+
+class SchemaMismatch(ValueError):
+    """Raised when an existing file does not match the expected schema."""
+
+
+def check_schema(path: str | os.PathLike, schema: pa.Schema) -> None:
+    """Raise :class:`SchemaMismatch` unless *path* was written with *schema*."""
+    on_disk = pq.read_schema(path)
+    expected = [(f.name, f.type) for f in schema]
+    actual = [(f.name, f.type) for f in on_disk if f.name in schema.names]
+    if on_disk.names[: len(schema)] != schema.names or actual != expected:
+        raise SchemaMismatch(
+            f"{path} does not match the expected storage schema; "
+            f"run `python -m funding_curve.storage.migrate {path}` first"
+        )
+
+
+def append_parquet(
+    df: pd.DataFrame,
+    path: str | os.PathLike,
+    schema: pa.Schema,
+    *,
+    overwrite: bool = False,
+    index: Optional[str] = None,
+) -> None:
+    """Conform *df* to *schema* and append it (or create / overwrite *path*).
+
+    *index* names a schema column to store as the pandas index (the
+    feature store keeps ``ts_snap`` as its index for notebook use).
+    """
+    append = not overwrite and Path(path).exists()
+    if append:
+        check_schema(path, schema)
+    out = conform(df, schema)
+    for name in label_columns(schema):
+        # Plain strings on disk: fastparquet mis‑reads appended row groups
+        # whose categories differ (e.g. binance/ETHUSDT vs bybit/BTCUSDT).
+        out[name] = out[name].astype(str)
+    if index is not None:
+        out = out.set_index(index)
+    out.to_parquet(
+        path,
+        engine=ENGINE,
+        compression="snappy",
+        index=index is not None,
+        append=append,
+        row_group_offsets=ROW_GROUP_ROWS,
+    )
+
+
+def read_parquet(
+    path: str | os.PathLike,
+    schema: pa.Schema,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[list] = None,
+    index: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read *path* with pyarrow, returning a frame conformed to *schema*.
+
+    Label columns (``exchange`` / ``symbol``) are decoded straight into
+    pandas categories, so they never materialise as per‑row Python strings.
+    *filters* (pyarrow DNF) prune row groups via their min/max statistics.
+    Schema columns stored as the pandas index (see ``append_parquet``'s
+    *index*) come back as columns, or as the index again if named in *index*.
+    """
+    cols: Optional[List[str]] = list(columns) if columns is not None else None
+    table = pq.read_table(
+        path,
+        columns=cols,
+        filters=filters,
+        read_dictionary=[c for c in label_columns(schema) if cols is None or c in cols],
+    )
+    return _to_frame(table, schema, cols, index)
+
+
+def read_between(
+    path: str | os.PathLike,
+    schema: pa.Schema,
+    lo: pd.Timestamp,
+    hi: pd.Timestamp,
+    *,
+    ts_col: str = "ts_snap",
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Rows with ``lo <= ts_col < hi``, conformed to *schema*.
+
+    Row groups whose statistics miss the window are skipped; the rest are
+    streamed in ``READ_BATCH_ROWS`` batches and filtered batch by batch.
+    fastparquet writes one page per column chunk, so a batch still decodes
+    its whole row group: peak memory is the window plus one row group
+    (``ROW_GROUP_ROWS``), not the file.
+    """
+    cols: Optional[List[str]] = list(columns) if columns is not None else None
+    pf = pq.ParquetFile(path, read_dictionary=[c for c in label_columns(schema) if cols is None or c in cols])
+    lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+    row_groups = [
+        rg for rg, (first, last) in enumerate(_ts_ranges(pf.metadata, ts_col))
+        if first is None or (first < hi and last >= lo)
+    ]
+    read_cols = cols if cols is None or ts_col in cols else cols + [ts_col]
+    batches = []
+    for batch in pf.iter_batches(batch_size=READ_BATCH_ROWS, row_groups=row_groups, columns=read_cols):
+        ts = batch.column(ts_col)
+        mask = pc.and_(
+            pc.greater_equal(ts, pa.scalar(lo, type=ts.type)), pc.less(ts, pa.scalar(hi, type=ts.type))
+        )
+        batches.append(batch.filter(mask))
+    table = pa.Table.from_batches(batches) if batches else pf.schema_arrow.empty_table()
+    return _to_frame(table, schema, cols, None)
+
+
+def _to_frame(table: pa.Table, schema: pa.Schema, cols: Optional[List[str]], index: Optional[str]) -> pd.DataFrame:
+    if cols is not None:
+        schema = pa.schema([schema.field(c) for c in cols])
+    df = table.to_pandas()
+    stored_index = [n for n in df.index.names if n is not None and n in schema.names]
+    if stored_index:
+        df = df.reset_index(stored_index)
+    out = conform(df.reset_index(drop=True), schema)
+    return out.set_index(index) if index is not None else out
+
+
+def _ts_ranges(meta: pq.FileMetaData, ts_col: str) -> List[Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]]:
+    """UTC (min, max) of *ts_col* per row group; ``(None, None)`` without stats."""
+    col = meta.schema.to_arrow_schema().get_field_index(ts_col)
+    out = []
+    for rg in range(meta.num_row_groups):
+        stats = meta.row_group(rg).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            out.append((None, None))
+            continue
+        lo, hi = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+        out.append((lo if lo.tzinfo else lo.tz_localize("UTC"), hi if hi.tzinfo else hi.tz_localize("UTC")))
+    return out
+
+
+def snapshot_runs(df: pd.DataFrame, breaks: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Split long curve rows (file order) into snapshots.
+
+    A snapshot is a run of contiguous rows for one (exchange, symbol) with
+    increasing ``bucket_start_h``; a run also ends at every row offset in
+    *breaks* (e.g. partition boundaries).  Returns the start row of each
+    snapshot and its time in epoch‑ms, the max ``ts_snap`` over the run.
+    """
+    n = len(df)
+    ex = pd.factorize(df["exchange"])[0]
+    sym = pd.factorize(df["symbol"])[0]
+    bucket = df["bucket_start_h"].to_numpy()
+    first = np.ones(n, dtype=bool)
+    first[1:] = (bucket[1:] <= bucket[:-1]) | (ex[1:] != ex[:-1]) | (sym[1:] != sym[:-1])
+    if breaks is not None:
+        first[breaks[breaks < n]] = True
+    starts = np.flatnonzero(first)
+    if not n:
+        return starts, np.empty(0, dtype="int64")
+    ts_ms = pd.DatetimeIndex(df["ts_snap"]).as_unit("ms").asi8
+    return starts, np.maximum.reduceat(ts_ms, starts)
+
+
+def expire_before(
+    path: str | os.PathLike,
+    schema: pa.Schema,
+    cutoff: pd.Timestamp,
+    *,
+    ts_col: str = "ts_snap",
+    snapshots: bool = False,
+) -> int:
+    """Drop rows with ``ts_col < cutoff`` from *path*; return rows removed.
+
+    With *snapshots* (long curve files) whole snapshots are expired instead:
+    each run from :func:`snapshot_runs` is dropped only when its newest
+    ``ts_snap`` is older than *cutoff*, so no partial curves are left
+    behind.  Row‑group statistics are checked first, so the common "nothing
+    old enough yet" case costs a footer read.  Otherwise the surviving rows
+    are rewritten to a temp file and atomically swapped in.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    cutoff = pd.Timestamp(cutoff)
+    oldest = [first for first, _ in _ts_ranges(pq.ParquetFile(path).metadata, ts_col)]
+    if all(m is not None and m >= cutoff for m in oldest):
+        return 0
+
+    if snapshots:
+        runs = read_parquet(path, schema, columns=["exchange", "symbol", "bucket_start_h", "ts_snap"])
+        starts, snap_ms = snapshot_runs(runs)
+        run_keep = snap_ms * 1_000_000 >= cutoff.value  # Timestamp.value is ns
+        if run_keep.all():
+            return 0
+        keep = np.repeat(run_keep, np.diff(np.append(starts, len(runs))))
+        del runs
+        df = read_parquet(path, schema)
+    else:
+        df = read_parquet(path, schema)
+        keep = (df[ts_col] >= cutoff).to_numpy()
+    removed = int((~keep).sum())
+    if removed:
+        tmp = path.with_name(path.name + ".expiring")
+        append_parquet(df.loc[keep], tmp, schema, overwrite=True)
+        os.replace(tmp, path)
+    return removed
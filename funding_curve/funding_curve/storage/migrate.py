@@ -0,0 +1,91 @@
+"""funding_curve/storage/migrate.py
+
+Rewrite existing parquet files into the explicit storage schemas.
+
+Older snapshots were written with pandas‑inferred dtypes (object
+``exchange``, ns timestamps, int64 buckets, ``bucket_end_h``, no
+``symbol``).  This tool reads such a file, fills ``symbol`` for legacy
+single‑symbol data, conforms it to the target schema and atomically
+replaces the original (or writes to ``--out``).
+
+Run:
+
+    poetry run python -m funding_curve.storage.migrate \
+        storage/processed/curve_live.parquet --kind long --symbol BTCUSDT
+
+``--kind`` defaults to a guess from the file's columns.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import pyarrow.parquet as pq
+from loguru import logger
+
+from funding_curve.storage.db import append_parquet
+from funding_curve.storage.schemas import SCHEMAS
+
+DEFAULT_SYMBOL = os.getenv("FUNDING_SYMBOL", "BTCUSDT")
+
+
+def guess_kind(path: str | os.PathLike) -> str:
+    """Infer the schema key ("prints", "long", "rollup", "features", "wide") from columns."""
+    names = set(pq.read_schema(path).names)
+    if "bucket_start_h" in names:
+        return "long"
+    if "ts_window" in names:
+        return "rollup"
+    if "predicted_rate" in names:
+        return "prints"
+    if "pca1" in names:
+        return "features"
+    return "wide"
+
+
+def migrate_file(
+    src: str | os.PathLike,
+    *,
+    kind: Optional[str] = None,
+    dst: str | os.PathLike | None = None,
+    symbol: str = DEFAULT_SYMBOL,
+) -> Path:
+    """Rewrite *src* into the storage schema for *kind*; return output path."""
+    src = Path(src)
+    kind = kind or guess_kind(src)
+    schema = SCHEMAS[kind]
+
+    df = pq.read_table(src).to_pandas()
+    # Feature / wide files are written with ts_snap as index.
+    if "ts_snap" in schema.names and "ts_snap" not in df.columns:
+        df = df.reset_index()
+    if "symbol" in schema.names and "symbol" not in df.columns:
+        df["symbol"] = symbol
+
+    out = Path(dst) if dst is not None else src
+    tmp = out.with_name(out.name + ".migrating")
+    append_parquet(df, tmp, schema, overwrite=True, index="ts_snap" if kind == "features" else None)
+    size_before = src.stat().st_size
+    os.replace(tmp, out)
+
+    logger.info(
+        "migrated {} [{}] → {}  ({:,} rows, {:,} → {:,} bytes)",
+        src, kind, out, len(df), size_before, out.stat().st_size,
+    )
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate parquet files to the explicit storage schemas")
+    parser.add_argument("paths", nargs="+", help="parquet files to rewrite")
+    parser.add_argument("--kind", choices=sorted(SCHEMAS), help="schema to apply (default: guess)")
+    parser.add_argument("--out", help="output path (single input only; default: in place)")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL, help="symbol for legacy files without one")
+    args = parser.parse_args()
+
+    if args.out and len(args.paths) > 1:
+        parser.error("--out requires exactly one input path")
+    for p in args.paths:
+        migrate_file(p, kind=args.kind, dst=args.out, symbol=args.symbol)
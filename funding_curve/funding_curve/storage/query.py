@@ -0,0 +1,322 @@
+# =============================================================
+# FILE: funding_curve/storage/query.py
+# =============================================================
+"""As‑of queries over stored curve history.
+
+"What did the curve look like at time T for venue X?" without loading
+whole parquet files into pandas:
+
+* **Snapshots** – the builder writes 8 contiguous rows per snapshot and
+  each row keeps its own print's ``ts_snap``, so a snapshot is a run of
+  rows for one (exchange, symbol) with increasing ``bucket_start_h``,
+  stamped with the **max** ``ts_snap`` of the run (as
+  ``CurveRollup.update`` does).
+* **Time index** – built once from the compact ``exchange`` / ``symbol`` /
+  ``ts_snap`` / ``bucket_start_h`` columns: per (exchange, symbol) a
+  sorted ``int64`` array of snapshot times (epoch‑ms) plus the partition
+  each snapshot lives in.  Lookups are ``np.searchsorted`` on that array.
+* **Partitions** – runs of consecutive row groups holding about
+  ``PARTITION_ROWS`` rows (per‑snapshot appends leave thousands of 8‑row
+  groups).  One ``ParquetFile`` (footer parsed once) is kept per path.
+  Partitions are decoded on demand into dense ``(n_snapshots × 8)`` bucket
+  matrices and kept in an LRU cache capped at ``cache_bytes`` (default
+  ``CURVE_CACHE_MB`` = 256 MB).
+* **Batch as‑of join** – :meth:`CurveStore.asof` takes an arbitrary array
+  of timestamps (e.g. trade times) and gathers every answer with one
+  ``searchsorted`` plus one fancy‑index per touched partition.
+
+Duplicates (same venue, symbol and snapshot time in history *and* live)
+resolve to the last written.  A file replaced on disk (``compact``,
+retention) is detected by :meth:`CurveStore.refresh` and re‑indexed.
+
+```python
+store = CurveStore()
+store.asof(trades["ts"], exchange="binance")          # one row per trade
+store.range("2025-05-01", "2025-05-02", exchange="bybit")
+```
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from funding_curve.storage.db import snapshot_runs
+from funding_curve.storage.schemas import BUCKET_COLS, CURVE_LONG_SCHEMA, label_columns
+
+__all__ = ["CurveStore", "DEFAULT_SOURCES"]
+
+DEFAULT_SOURCES = (
+    Path("storage/processed/curve_history.parquet"),
+    Path("storage/processed/curve_live.parquet"),
+)
+CACHE_BYTES = int(os.getenv("CURVE_CACHE_MB", "256")) * 1024 * 1024
+PARTITION_ROWS = int(os.getenv("CURVE_PARTITION_ROWS", "65536"))
+
+_N_BUCKETS = len(BUCKET_COLS)
+_Key = Tuple[str, str]  # (exchange, symbol)
+_INDEX_COLS = ["exchange", "symbol", "ts_snap", "bucket_start_h"]
+
+
+@dataclass
+class _Partition:
+    """One decoded row‑group range: per key, sorted snapshot times + bucket matrix."""
+
+    curves: Dict[_Key, Tuple[np.ndarray, np.ndarray]]
+    nbytes: int
+
+
+@dataclass
+class _KeyIndex:
+    ts: np.ndarray    # int64 epoch‑ms, sorted, unique
+    part: np.ndarray  # int32 partition id per snapshot
+
+
+@dataclass
+class _File:
+    pf: pq.ParquetFile
+    inode: int
+    size: int
+    row_groups: int   # row groups already indexed
+
+
+def _to_ms(times) -> np.ndarray:
+    """Timestamps (datetime‑like or int epoch‑ms) → int64 epoch‑ms array."""
+    arr = np.asarray(times)
+    if arr.dtype.kind in "iu":
+        return arr.astype("int64")
+    return pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(arr), utc=True)).as_unit("ms").asi8
+
+
+def _last_unique(ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Stable time order of *ts* keeping the last of equal times: (order, ts)."""
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    last = np.ones(len(ts), dtype=bool)
+    last[:-1] = ts[1:] != ts[:-1]
+    return order[last], ts[last]
+
+
+class CurveStore:
+    """Point / range / batch as‑of lookups over long curve snapshot files."""
+
+    def __init__(
+        self,
+        paths: Sequence[str | os.PathLike] = DEFAULT_SOURCES,
+        *,
+        cache_bytes: int = CACHE_BYTES,
+        partition_rows: int = PARTITION_ROWS,
+    ) -> None:
+        self.paths = [Path(p) for p in paths]
+        self.cache_bytes = cache_bytes
+        self.partition_rows = partition_rows
+        self._reset()
+        self.refresh()
+
+    def _reset(self) -> None:
+        self._files: Dict[Path, _File] = {}
+        self._parts: List[Tuple[Path, int, int]] = []   # partition id → (file, first rg, stop rg)
+        self._index: Dict[_Key, _KeyIndex] = {}
+        self._cache: "OrderedDict[int, _Partition]" = OrderedDict()
+        self._cached_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+    def _stat(self) -> Dict[Path, os.stat_result]:
+        return {path: path.stat() for path in self.paths if path.exists()}
+
+    def refresh(self) -> None:
+        """Index row groups appended since the last call (cheap if none).
+
+        A file that was replaced (new inode, shrank or vanished) invalidates
+        the whole index, which is then rebuilt.
+        """
+        stats = self._stat()
+        for path, known in self._files.items():
+            st = stats.get(path)
+            if st is None or st.st_ino != known.inode or st.st_size < known.size:
+                self._reset()
+                break
+
+        new: Dict[_Key, List[Tuple[np.ndarray, np.ndarray]]] = {}
+        for path, st in stats.items():
+            known = self._files.get(path)
+            if known is not None and known.size == st.st_size:
+                continue
+            pf = pq.ParquetFile(path, read_dictionary=label_columns(CURVE_LONG_SCHEMA))
+            first = known.row_groups if known else 0
+            self._files[path] = _File(pf, st.st_ino, st.st_size, pf.num_row_groups)
+            if first < pf.num_row_groups:
+                self._index_row_groups(path, pf, first, new)
+
+        for key, chunks in new.items():
+            old = self._index.get(key)
+            ts = ([old.ts] if old else []) + [c[0] for c in chunks]
+            part = ([old.part] if old else []) + [c[1] for c in chunks]
+            self._index[key] = self._merge(np.concatenate(ts), np.concatenate(part))
+
+    def _index_row_groups(self, path: Path, pf: pq.ParquetFile, first: int,
+                          new: Dict[_Key, List[Tuple[np.ndarray, np.ndarray]]]) -> None:
+        """Cut row groups ``first …`` into partitions and index their snapshots."""
+        meta = pf.metadata
+        sizes = np.array([meta.row_group(rg).num_rows for rg in range(first, pf.num_row_groups)])
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+        # Partitions: consecutive row groups up to ~partition_rows rows each.
+        bounds = [0]
+        for i in range(1, len(sizes)):
+            if offsets[i] - offsets[bounds[-1]] >= self.partition_rows:
+                bounds.append(i)
+        part_rows = offsets[bounds]
+        base = len(self._parts)
+        for lo, hi in zip(bounds, bounds[1:] + [len(sizes)]):
+            self._parts.append((path, first + lo, first + hi))
+
+        df = pf.read_row_groups(range(first, pf.num_row_groups), columns=_INDEX_COLS).to_pandas()
+        starts, snap_ts = snapshot_runs(df, part_rows)
+        part = (base + np.searchsorted(part_rows, starts, side="right") - 1).astype("int32")
+        snaps = pd.DataFrame({
+            "exchange": df["exchange"].to_numpy()[starts],
+            "symbol": df["symbol"].to_numpy()[starts],
+        })
+        for (ex, sym), idx in snaps.groupby(["exchange", "symbol"], sort=False).indices.items():
+            new.setdefault((str(ex), str(sym)), []).append((snap_ts[idx], part[idx]))
+
+    @staticmethod
+    def _merge(ts: np.ndarray, part: np.ndarray) -> _KeyIndex:
+        # Partitions arrive in write order, so the last duplicate wins.
+        order, ts = _last_unique(ts)
+        return _KeyIndex(ts, part[order])
+
+    def keys(self) -> List[_Key]:
+        """Indexed (exchange, symbol) pairs."""
+        return sorted(self._index)
+
+    # ------------------------------------------------------------------
+    # Partition cache
+    # ------------------------------------------------------------------
+    def _partition(self, part_id: int) -> _Partition:
+        hit = self._cache.get(part_id)
+        if hit is not None:
+            self._cache.move_to_end(part_id)
+            return hit
+
+        path, lo, hi = self._parts[part_id]
+        df = self._files[path].pf.read_row_groups(
+            range(lo, hi), columns=_INDEX_COLS + ["fwd_rate_ann"]
+        ).to_pandas()
+        starts, snap_ts = snapshot_runs(df)
+        snap_of_row = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(df))))
+        col_all = df["bucket_start_h"].to_numpy() // 8
+        rate_all = df["fwd_rate_ann"].to_numpy(dtype="float64")
+        snaps = pd.DataFrame({
+            "exchange": df["exchange"].to_numpy()[starts],
+            "symbol": df["symbol"].to_numpy()[starts],
+        })
+
+        curves: Dict[_Key, Tuple[np.ndarray, np.ndarray]] = {}
+        nbytes = 0
+        for (ex, sym), idx in snaps.groupby(["exchange", "symbol"], sort=False).indices.items():
+            order, ts = _last_unique(snap_ts[idx])
+            dense = np.full(len(starts), -1)
+            dense[idx[order]] = np.arange(len(ts))
+            rows = np.flatnonzero(dense[snap_of_row] >= 0)
+            values = np.full((len(ts), _N_BUCKETS), np.nan)
+            values[dense[snap_of_row[rows]], col_all[rows]] = rate_all[rows]
+            curves[(str(ex), str(sym))] = (ts, values)
+            nbytes += ts.nbytes + values.nbytes
+
+        part = _Partition(curves, nbytes)
+        self._cache[part_id] = part
+        self._cached_bytes += nbytes
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted.nbytes
+        return part
+
+    def _gather(self, key: _Key, snap_pos: np.ndarray) -> np.ndarray:
+        """Bucket rows for index positions *snap_pos* (all valid)."""
+        kidx = self._index[key]
+        out = np.full((len(snap_pos), _N_BUCKETS), np.nan)
+        parts = kidx.part[snap_pos]
+        snap_ts = kidx.ts[snap_pos]
+        for part_id in np.unique(parts):
+            sel = parts == part_id
+            ts, values = self._partition(int(part_id)).curves[key]
+            out[sel] = values[np.searchsorted(ts, snap_ts[sel])]
+        return out
+
+    def _key(self, exchange: str, symbol: Optional[str]) -> _Key:
+        if symbol is None:
+            matches = [k for k in self._index if k[0] == exchange]
+            if not matches:
+                raise KeyError(f"no curve history for exchange {exchange!r}")
+            if len(matches) > 1:
+                raise KeyError(f"symbol required for {exchange!r}: {[k[1] for k in matches]}")
+            return matches[0]
+        key = (exchange, symbol)
+        if key not in self._index:
+            raise KeyError(f"no curve history for {key}")
+        return key
+
+    @staticmethod
+    def _frame(index, snap_ts: np.ndarray, values: np.ndarray, valid: np.ndarray) -> pd.DataFrame:
+        out = pd.DataFrame(values, columns=BUCKET_COLS, index=index)
+        ts = pd.to_datetime(np.where(valid, snap_ts, 0), unit="ms", utc=True)
+        out.insert(0, "ts_snap", pd.Series(ts, index=index).where(valid))
+        return out
+
+    # ------------------------------------------------------------------
+    # Public queries
+    # ------------------------------------------------------------------
+    def asof(
+        self,
+        times: Iterable,
+        exchange: str,
+        symbol: Optional[str] = None,
+        *,
+        tolerance: Optional[pd.Timedelta] = None,
+    ) -> pd.DataFrame:
+        """Batch as‑of join: latest curve with ``ts_snap <= t`` for each *t*.
+
+        Returns one row per input time (same order) with ``ts_snap`` and the
+        eight ``b_*`` buckets; NaN where no snapshot precedes *t* or it is
+        older than *tolerance*.
+        """
+        key = self._key(exchange, symbol)
+        kidx = self._index[key]
+        t_ms = _to_ms(times)
+        pos = np.searchsorted(kidx.ts, t_ms, side="right") - 1
+        valid = pos >= 0
+        snap_ts = np.where(valid, kidx.ts[np.maximum(pos, 0)], 0)
+        if tolerance is not None:
+            valid &= (t_ms - snap_ts) <= pd.Timedelta(tolerance) // pd.Timedelta(milliseconds=1)
+
+        values = np.full((len(t_ms), _N_BUCKETS), np.nan)
+        values[valid] = self._gather(key, pos[valid])
+        index = pd.to_datetime(t_ms, unit="ms", utc=True)
+        return self._frame(index, snap_ts, values, valid)
+
+    def at(self, time, exchange: str, symbol: Optional[str] = None) -> pd.Series:
+        """Point as‑of lookup: the curve in force at *time*."""
+        return self.asof([time], exchange, symbol).iloc[0]
+
+    def range(self, start, end, exchange: str, symbol: Optional[str] = None) -> pd.DataFrame:
+        """Every snapshot with ``start <= ts_snap <= end``, indexed by ts_snap."""
+        key = self._key(exchange, symbol)
+        kidx = self._index[key]
+        lo, hi = _to_ms([start, end])
+        pos = np.arange(
+            np.searchsorted(kidx.ts, lo, side="left"),
+            np.searchsorted(kidx.ts, hi, side="right"),
+        )
+        values = self._gather(key, pos)
+        index = pd.to_datetime(kidx.ts[pos], unit="ms", utc=True).rename("ts_snap")
+        return pd.DataFrame(values, columns=BUCKET_COLS, index=index)
@@ -0,0 +1,189 @@
+# =============================================================
+# FILE: funding_curve/storage/schemas.py
+# =============================================================
+"""Explicit on‑disk schemas for every parquet file the project writes.
+
+Until now each writer persisted whatever dtypes pandas inferred (object
+``exchange`` strings, ns datetimes, int64 buckets, a redundant
+``bucket_end_h`` per row).  The schemas below are the single source of
+truth instead:
+
+* ``exchange`` / ``symbol`` → ``string`` on disk (plain UTF‑8 pages:
+  fastparquet cannot append row groups whose categories differ, and
+  snappy‑compressed repeats cost little); pandas *category* in memory –
+  :func:`conform` and ``read_parquet`` apply it (``LABEL_COLUMNS``)
+* timestamps               → ``timestamp[ms, UTC]``
+* bucket offsets           → ``int8`` (0 … 56 h); ``bucket_end_h`` is
+  derivable as ``bucket_start_h + 8`` and is no longer stored
+* rates                    → ``float64`` by default, ``float32`` when
+  ``FUNDING_COMPACT_RATES=1`` (halves the rate columns; ~7 significant
+  digits is ample for 8‑h funding prints)
+
+Writers call :func:`conform` before handing a frame to the parquet engine;
+existing files are rewritten with ``python -m funding_curve.storage.migrate``.
+Note the layout does not make a one‑snapshot append smaller: files shrink
+on migration because the rewrite merges the many tiny row groups left by
+per‑snapshot appends, so writers should batch appends where they can.
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+__all__ = [
+    "RATE_TYPE",
+    "BUCKET_COLS",
+    "PRINT_SCHEMA",
+    "CURVE_LONG_SCHEMA",
+    "CURVE_WIDE_SCHEMA",
+    "FEATURE_SCHEMA",
+    "ROLLUP_STATS",
+    "ROLLUP_SCHEMA",
+    "SCHEMAS",
+    "LABEL_COLUMNS",
+    "conform",
+    "to_table",
+    "label_columns",
+]
+
+# ---------------------------------------------------------------------------
+# Primitive types
+# ---------------------------------------------------------------------------
+RATE_TYPE: pa.DataType = (
+    pa.float32() if os.getenv("FUNDING_COMPACT_RATES", "0") == "1" else pa.float64()
+)
+_TS    = pa.timestamp("ms", tz="UTC")
+_LABEL = pa.string()                              # venue / symbol names (category in memory)
+
+# Low‑cardinality labels: plain strings on disk, pandas category in memory.
+LABEL_COLUMNS = ("exchange", "symbol")
+
+BUCKET_COLS: List[str] = [f"b_{h}" for h in range(0, 64, 8)]
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+PRINT_SCHEMA = pa.schema(
+    [
+        pa.field("exchange", _LABEL, nullable=False),
+        pa.field("symbol", _LABEL, nullable=False),
+        pa.field("ts_snap", _TS, nullable=False),
+        pa.field("predicted_rate", RATE_TYPE),
+        pa.field("funding_time", _TS, nullable=False),
+    ]
+)
+
+CURVE_LONG_SCHEMA = pa.schema(
+    [
+        pa.field("exchange", _LABEL, nullable=False),
+        pa.field("symbol", _LABEL, nullable=False),
+        pa.field("ts_snap", _TS, nullable=False),
+        pa.field("bucket_start_h", pa.int8(), nullable=False),
+        pa.field("fwd_rate_ann", RATE_TYPE),
+        pa.field("raw_rate", RATE_TYPE),
+        pa.field("funding_time", _TS, nullable=False),
+    ]
+)
+
+CURVE_WIDE_SCHEMA = pa.schema(
+    [pa.field("ts_snap", _TS, nullable=False)]
+    + [pa.field(c, RATE_TYPE) for c in BUCKET_COLS]
+)
+
+# Engineered factors stay float64: they feed regressions / PCA downstream.
+FEATURE_SCHEMA = pa.schema(
+    list(CURVE_WIDE_SCHEMA)
+    + [
+        pa.field(c, pa.float64())
+        for c in (
+            "btc_close",
+            "btc_ret_1d",
+            "level",
+            "slope",
+            "decay1",
+            "decay2",
+            "convexity",
+            "pca1",
+            "pca2",
+        )
+    ]
+)
+
+# Downsampled curve tiers (1 s / 1 min / 10 min): one row per venue, symbol
+# and window; per bucket the last / mean / min / max annualised rate.
+ROLLUP_STATS: List[str] = ["last", "mean", "min", "max"]
+
+ROLLUP_SCHEMA = pa.schema(
+    [
+        pa.field("exchange", _LABEL, nullable=False),
+        pa.field("symbol", _LABEL, nullable=False),
+        pa.field("ts_window", _TS, nullable=False),   # window start
+        pa.field("n", pa.int32(), nullable=False),    # snapshots in window
+    ]
+    + [pa.field(f"{stat}_{c}", RATE_TYPE) for stat in ROLLUP_STATS for c in BUCKET_COLS]
+)
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    "prints": PRINT_SCHEMA,
+    "long": CURVE_LONG_SCHEMA,
+    "wide": CURVE_WIDE_SCHEMA,
+    "features": FEATURE_SCHEMA,
+    "rollup": ROLLUP_SCHEMA,
+}
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def label_columns(schema: pa.Schema) -> List[str]:
+    """Label columns of *schema* (for pyarrow ``read_dictionary=``)."""
+    return [name for name in schema.names if name in LABEL_COLUMNS]
+
+
+def _cast(name: str, col: pd.Series, dtype: pa.DataType) -> pd.Series:
+    if name in LABEL_COLUMNS:
+        return col.astype("category")
+    if pa.types.is_timestamp(dtype):
+        return pd.to_datetime(col, utc=True).astype(dtype.to_pandas_dtype())
+    return col.astype(dtype.to_pandas_dtype())
+
+
+def conform(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+    """Return *df* restricted to, ordered by and cast to *schema*.
+
+    Columns not in the schema are dropped; missing columns raise
+    ``KeyError`` so silent schema drift is impossible.
+    """
+    missing = [name for name in schema.names if name not in df.columns]
+    if missing:
+        raise KeyError(f"frame is missing schema columns: {missing}")
+    return pd.DataFrame(
+        {f.name: _cast(f.name, df[f.name], f.type) for f in schema},
+        index=df.index,
+    )
+
+
+def _arrow_column(col: pd.Series, dtype: pa.DataType) -> pa.Array:
+    if pa.types.is_string(dtype):
+        return pa.array(col.to_numpy(dtype=object), type=dtype)
+    if pa.types.is_timestamp(dtype):
+        if not isinstance(col.dtype, pd.DatetimeTZDtype):
+            col = pd.to_datetime(col, utc=True)
+        return pa.array(col.to_numpy(f"datetime64[{dtype.unit}]"), type=dtype)  # UTC wall time
+    return pa.array(col.to_numpy(), type=dtype, from_pandas=True)
+
+
+def to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Convert *df* to an Arrow table carrying *schema* exactly.
+
+    Builds the Arrow columns straight from the frame's arrays (no pandas
+    :func:`conform` round trip), so an 8‑row snapshot converts in well
+    under a millisecond.  Same column rules as :func:`conform`.
+    """
+    missing = [name for name in schema.names if name not in df.columns]
+    if missing:
+        raise KeyError(f"frame is missing schema columns: {missing}")
+    return pa.Table.from_pydict({f.name: _arrow_column(df[f.name], f.type) for f in schema}, schema=schema)
@@ -0,0 +1,70 @@
+"""FundingCurveBuilder keying and CurveEngine ≡ builder equivalence."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funding_curve.builders.curve import FundingCurveBuilder
+from funding_curve.builders.engine import CurveEngine
+from funding_curve.funding_collectors import FundingPrint
+
+EIGHT_H = 8 * 3_600_000
+T0 = 1_746_500_000_000
+
+
+def _prints(n: int, seed: int):
+    """Random interleaving of several venues / symbols, with duplicates,
+    out‑of‑order funding times and NaN rates mixed in."""
+    rng = np.random.default_rng(seed)
+    keys = [("binance", "BTCUSDT"), ("binance", "ETHUSDT"), ("bybit", "BTCUSDT"), ("bybit", "SOLUSDT")]
+    step = {k: 0 for k in keys}
+    out = []
+    for i in range(n):
+        key = keys[rng.integers(len(keys))]
+        step[key] += int(rng.choice([1, 1, 1, 0, -1, 2]))  # repeat / step back / skip a window
+        rate = np.nan if rng.random() < 0.05 else float(rng.normal(1e-4, 5e-5))
+        out.append(FundingPrint(key[0], key[1], T0 + i, rate, T0 + step[key] * EIGHT_H))
+    return out
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["exchange", "symbol", "bucket_start_h"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_engine_matches_builder(seed):
+    prints = _prints(2_000, seed)
+    builder = FundingCurveBuilder(emit_on_roll=False)
+    latest = {}
+    for fp in prints:
+        snap = builder.update(fp)
+        if snap is not None:
+            latest[(fp.exchange, fp.symbol)] = snap
+
+    engine = CurveEngine(capacity=2)          # forces the array to grow
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.choice(np.arange(1, len(prints)), size=40, replace=False))
+    for batch in np.split(np.array(prints, dtype=object), cuts):
+        engine.update(list(batch))
+
+    assert len(latest) == 4
+    expected = _sorted(pd.concat(latest.values(), ignore_index=True))
+    pd.testing.assert_frame_equal(_sorted(engine.snapshot()), expected, check_dtype=False)
+
+
+def test_builder_keeps_symbols_apart():
+    builder = FundingCurveBuilder()
+    snaps = [builder.update(FundingPrint("binance", "BTCUSDT", T0, 1e-4, T0 + i * EIGHT_H)) for i in range(8)]
+    assert snaps[-1] is not None and set(snaps[-1]["symbol"]) == {"BTCUSDT"}
+
+    # One ETH print on the same venue neither emits nor touches the BTC curve.
+    assert builder.update(FundingPrint("binance", "ETHUSDT", T0, 2e-4, T0 + 8 * EIGHT_H)) is None
+    snap = builder.update(FundingPrint("binance", "BTCUSDT", T0, 1e-4, T0 + 8 * EIGHT_H))
+    assert set(snap["symbol"]) == {"BTCUSDT"}
+    assert (snap["raw_rate"] == 1e-4).all()
+
+    builder.reset("binance", "ETHUSDT")
+    assert set(builder._buffers) == {("binance", "BTCUSDT")}
+    builder.reset("binance")
+    assert not builder._buffers
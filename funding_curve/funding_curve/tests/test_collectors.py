@@ -0,0 +1,122 @@
+"""Reconnecting WS loop and shared session lease, against a local aiohttp server."""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+
+import aiohttp
+from aiohttp import web
+
+from funding_curve import funding_collectors as fc
+from funding_curve.funding_collectors import BybitCollector, ExponentialBackoff, FundingPrint
+from funding_curve.utils.time import from_ms
+
+TOPIC = "tickers.BTCUSDT"
+FUNDING_MS = 1_746_518_400_000
+
+
+def _ticker(ts: int, rate: float) -> str:
+    return json.dumps({"topic": TOPIC, "ts": ts, "data": {"fundingRate": str(rate), "nextFundingTime": str(FUNDING_MS)}})
+
+
+async def _server(frames_per_connection):
+    """WS server sending one list of ticker frames per connection, then
+    dropping it; records the first frame each client sends."""
+    received = []
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        received.append(json.loads((await ws.receive()).data))
+        frames = frames_per_connection[len(received) - 1] if len(received) <= len(frames_per_connection) else []
+        for frame in frames:
+            await ws.send_str(frame)
+        if len(received) < len(frames_per_connection):
+            await ws.close()                      # drop → client must reconnect
+        else:
+            async for _ in ws:                    # last connection stays open until the client closes
+                pass
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"ws://127.0.0.1:{port}/ws", received
+
+
+def test_reconnect_resubscribes_and_backfills_gap(monkeypatch):
+    monkeypatch.setattr(fc.settings, "WS_BACKOFF_BASE", 0.01)
+    t0 = 1_746_500_000_000
+
+    async def scenario():
+        runner, url, received = await _server([
+            [_ticker(t0, 1e-4), _ticker(t0 + 1_000, 2e-4)],
+            [_ticker(t0 + 9_000, 3e-4)],
+        ])
+        monkeypatch.setattr(fc.settings, "BYBIT_WS_URL", url)
+        gaps = []
+
+        async def backfill(start, end):
+            gaps.append((start, end))
+            return [FundingPrint("bybit", "BTCUSDT", t0 + 5_000, 9e-4, t0 + 5_000)]
+
+        collector = BybitCollector()
+        monkeypatch.setattr(collector, "backfill_realised", backfill)
+        got = []
+        try:
+            async with collector:
+                stream = collector.stream_predicted()
+                async for fp in stream:
+                    got.append(fp)
+                    ws_session = fc.connections._ws_session
+                    if len(got) == 4:
+                        break
+                await stream.aclose()
+                assert fc.connections.active is not None      # collector still holds its lease
+                assert not ws_session.closed
+            assert fc.connections.active is None              # last lease released
+            assert ws_session.closed and fc.connections._ws_session is None
+        finally:
+            await runner.cleanup()
+        return got, gaps, received
+
+    got, gaps, received = asyncio.run(scenario())
+
+    subscribe = {"op": "subscribe", "args": [TOPIC]}
+    assert received == [subscribe, subscribe]                 # re‑sent after the drop
+    assert [fp.predicted_rate for fp in got] == [1e-4, 2e-4, 9e-4, 3e-4]
+    assert len(gaps) == 1
+    start, end = gaps[0]
+    assert start == from_ms(t0 + 1_000)                       # last live print before the outage
+    assert start < end <= from_ms(fc.now_ms())
+
+
+def test_backoff_full_jitter_grows_to_cap():
+    random.seed(3)
+    backoff = ExponentialBackoff(base=1.0, cap=8.0)
+    delays = [backoff.next_delay() for _ in range(6)]
+    ceilings = [1, 2, 4, 8, 8, 8]
+    assert all(0 <= d <= c for d, c in zip(delays, ceilings))
+    assert backoff.attempt == 6
+    backoff.reset()
+    assert backoff.attempt == 0 and backoff.next_delay() <= 1.0
+
+
+def test_lease_is_reference_counted():
+    async def scenario():
+        manager = fc.ConnectionManager()
+        async with manager.lease() as outer:
+            async with manager.lease() as inner:
+                assert inner is outer
+                ws = manager.ws()
+            assert not outer.closed and not ws.closed         # one user left
+        return outer, ws, manager
+
+    outer, ws, manager = asyncio.run(scenario())
+    assert outer.closed and ws.closed and manager.active is None
+    assert isinstance(outer, aiohttp.ClientSession)
@@ -0,0 +1,58 @@
+"""Chunked (out‑of‑core) feature build must match the in‑memory build."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funding_curve import feature_build as fb
+from funding_curve.storage.db import append_parquet, read_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, FEATURE_SCHEMA
+
+
+def _synthetic_history(n_snaps: int = 400, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2024-01-01", periods=n_snaps, freq="8h", tz="UTC")
+    level = np.cumsum(rng.normal(0, 0.01, n_snaps)) + 0.1
+    frames = []
+    for exchange, bias in (("binance", 0.0), ("bybit", 0.005)):
+        raw = level[:, None] + bias + rng.normal(0, 0.002, (n_snaps, 8)) * np.arange(1, 9)
+        frames.append(pd.DataFrame({
+            "exchange": exchange,
+            "symbol": "BTCUSDT",
+            "ts_snap": np.repeat(ts, 8),
+            "bucket_start_h": np.tile(np.arange(0, 64, 8), n_snaps),
+            "fwd_rate_ann": raw.ravel(),
+            "raw_rate": raw.ravel() / 1000,
+            "funding_time": np.repeat(ts, 8),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    history = tmp_path / "curve_history.parquet"
+    append_parquet(_synthetic_history(), history, CURVE_LONG_SCHEMA, overwrite=True)
+
+    days = pd.date_range("2023-12-31", "2024-06-01", freq="D", tz="UTC")
+    closes = pd.DataFrame(
+        {"btc_close": 40_000 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.02, len(days))))},
+        index=days,
+    )
+    monkeypatch.setattr(fb, "SRC_HISTORY", history)
+    monkeypatch.setattr(fb, "SRC_LIVE", tmp_path / "missing.parquet")
+    monkeypatch.setattr(fb, "DST_FEATURE", tmp_path / "feature_store.parquet")
+    monkeypatch.setattr(fb, "_download_closes", lambda first, last: closes)
+    return tmp_path
+
+
+def test_chunked_matches_in_memory(sources):
+    fb.build_feature_store()
+    expected = read_parquet(fb.DST_FEATURE, FEATURE_SCHEMA)
+
+    rows = fb.build_feature_store_chunked(workers=2, window_days=10)
+    got = read_parquet(fb.DST_FEATURE, FEATURE_SCHEMA)
+
+    assert rows == len(expected) == len(got) > 300
+    assert got[["pca1", "pca2"]].notna().all().all()
+    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-8, atol=1e-10)
@@ -0,0 +1,86 @@
+"""Curve feed wire format: publisher → subscriber round trip."""
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from funding_curve import feed as feed_mod
+from funding_curve.feed import KIND_CURVE, KIND_SNAPSHOT, CurvePublisher, latest, subscribe
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA
+
+
+def _snapshot(exchange: str, symbol: str, rate: float) -> pd.DataFrame:
+    ts = pd.Timestamp("2025-05-05T08:00Z")
+    return pd.DataFrame({
+        "exchange": exchange,
+        "symbol": symbol,
+        "ts_snap": [ts] * 8,
+        "bucket_start_h": np.arange(0, 64, 8),
+        "bucket_end_h": np.arange(8, 72, 8),
+        "fwd_rate_ann": np.full(8, rate),
+        "raw_rate": np.full(8, rate / 1000),
+        "funding_time": [ts + pd.Timedelta(hours=8 * i) for i in range(8)],
+    })
+
+
+def test_current_curve_then_snapshots(tmp_path):
+    path = tmp_path / "feed.sock"
+
+    async def scenario():
+        async with CurvePublisher(path) as pub:
+            pub.publish(_snapshot("binance", "BTCUSDT", 0.1))
+            pub.publish(_snapshot("bybit", "BTCUSDT", 0.2))
+            pub.publish(_snapshot("binance", "BTCUSDT", 0.3))       # replaces binance's current curve
+
+            frames = []
+            stream = subscribe(path)
+            frames.append(await stream.__anext__())
+            pub.publish(_snapshot("bybit", "ETHUSDT", 0.4))
+            frames.append(await stream.__anext__())
+            await stream.aclose()
+            return frames, await latest(path)
+
+    frames, current = asyncio.run(scenario())
+    (kind0, table0), (kind1, table1) = frames
+    assert kind0 == KIND_CURVE and kind1 == KIND_SNAPSHOT
+    assert table0.schema.equals(CURVE_LONG_SCHEMA) and table1.schema.equals(CURVE_LONG_SCHEMA)
+
+    df0 = table0.to_pandas()
+    assert len(df0) == 16
+    assert df0.groupby("exchange")["fwd_rate_ann"].first().to_dict() == {"binance": 0.3, "bybit": 0.2}
+    df1 = table1.to_pandas()
+    assert set(df1["symbol"]) == {"ETHUSDT"} and len(df1) == 8
+    pd.testing.assert_series_equal(df1["funding_time"], _snapshot("bybit", "ETHUSDT", 0.4)["funding_time"].dt.as_unit("ms"))
+    assert len(current) == 24                                       # three (exchange, symbol) curves
+
+
+def test_slow_subscriber_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(feed_mod, "MAX_CLIENT_BUFFER", 64 * 1024)
+    path = tmp_path / "feed.sock"
+
+    async def scenario():
+        async with CurvePublisher(path) as pub:
+            reader, writer = await asyncio.open_unix_connection(str(path))   # connects, never reads
+            for _ in range(100):
+                await asyncio.sleep(0)
+                if pub._clients:
+                    break
+            assert len(pub._clients) == 1
+            for i in range(5_000):
+                pub.publish(_snapshot("binance", "BTCUSDT", float(i)))
+                if not pub._clients:
+                    break
+            dropped = not pub._clients
+
+            # A reading subscriber still gets the current curve afterwards.
+            stream = subscribe(path)
+            kind, table = await stream.__anext__()
+            await stream.aclose()
+            writer.close()
+            return dropped, i, kind, table
+
+    dropped, published, kind, table = asyncio.run(scenario())
+    assert dropped and published < 4_999
+    assert kind == KIND_CURVE and table.to_pandas()["fwd_rate_ann"].iloc[0] == float(published)
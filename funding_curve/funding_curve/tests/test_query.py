@@ -0,0 +1,129 @@
+"""As‑of lookups must match a plain pandas ``merge_asof`` over whole snapshots."""
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funding_curve.storage.db import append_parquet, read_parquet
+from funding_curve.storage.migrate import migrate_file
+from funding_curve.storage.query import CurveStore
+from funding_curve.storage.schemas import BUCKET_COLS, CURVE_LONG_SCHEMA
+
+# Frozen copy of storage/processed/curve_live.parquet as shipped (binance +
+# bybit BTCUSDT, 3–12 May 2025); the live file itself is appended to and
+# rewritten at runtime.
+FIXTURE = Path(__file__).resolve().parent / "data" / "curve_live_2025-05.parquet"
+
+
+@pytest.fixture
+def bundled(tmp_path) -> Path:
+    path = tmp_path / "curve_live.parquet"
+    shutil.copy(FIXTURE, path)
+    return path
+
+
+def _reference(path: Path, times: pd.DatetimeIndex, exchange: str) -> pd.DataFrame:
+    """Snapshots = contiguous runs of increasing buckets, stamped with max ts_snap."""
+    df = read_parquet(path, CURVE_LONG_SCHEMA)
+    df["exchange"] = df["exchange"].astype(str)
+    df["symbol"] = df["symbol"].astype(str)
+    new = (
+        (df["bucket_start_h"].diff() <= 0)
+        | (df["exchange"] != df["exchange"].shift())
+        | (df["symbol"] != df["symbol"].shift())
+    )
+    df["snap"] = new.cumsum()
+    df = df[df["exchange"] == exchange]
+    snap_ts = df.groupby("snap")["ts_snap"].max()
+    wide = df.pivot(index="snap", columns="bucket_start_h", values="fwd_rate_ann")
+    wide.columns = BUCKET_COLS
+    wide.insert(0, "ts_snap", snap_ts)
+    wide = wide.drop_duplicates("ts_snap", keep="last").sort_values("ts_snap", kind="stable")
+    left = pd.DataFrame({"t": times.as_unit(snap_ts.dt.unit)})
+    return pd.merge_asof(left, wide, left_on="t", right_on="ts_snap").set_index("t")
+
+
+def _ms(col: pd.Series) -> np.ndarray:
+    return pd.DatetimeIndex(col).as_unit("ms").asi8
+
+
+def _appended(path: Path, n_snaps: int = 60, first: int = 0) -> None:
+    """One append per snapshot (8‑row row groups), rows stamped per print."""
+    t0 = pd.Timestamp("2025-01-01", tz="UTC")
+    for i in range(first, first + n_snaps):
+        ts = t0 + pd.Timedelta(minutes=i)
+        append_parquet(pd.DataFrame({
+            "exchange": "binance" if i % 3 else "bybit",
+            "symbol": "BTCUSDT",
+            "ts_snap": [ts - pd.Timedelta(hours=8 * (7 - j)) for j in range(8)],
+            "bucket_start_h": np.arange(0, 64, 8),
+            "bucket_end_h": np.arange(8, 72, 8),
+            "fwd_rate_ann": i + np.arange(8) / 10,
+            "raw_rate": np.full(8, 1e-4),
+            "funding_time": [ts] * 8,
+        }), path, CURVE_LONG_SCHEMA)
+
+
+def test_bundled_snapshot_is_whole(bundled):
+    store = CurveStore([bundled])
+    # The first binance snapshot completes at 23:00:45 – no partial curve before it.
+    assert store.at("2025-05-05T12:00Z", "binance")[BUCKET_COLS].isna().all()
+    row = store.at("2025-05-06T12:00Z", "binance")
+    assert row["ts_snap"] == pd.Timestamp("2025-05-06 00:00:03.082", tz="UTC")
+    assert row[BUCKET_COLS].notna().all()
+
+
+@pytest.mark.parametrize("exchange", ["binance", "bybit"])
+def test_bundled_matches_merge_asof(bundled, exchange):
+    times = pd.date_range("2025-05-03", "2025-05-13", freq="37min", tz="UTC")
+    got = CurveStore([bundled]).asof(times, exchange, "BTCUSDT")
+    expected = _reference(bundled, times, exchange)
+    assert (got[BUCKET_COLS].notna().all(axis=1) == got["ts_snap"].notna()).all()
+    np.testing.assert_array_equal(_ms(got["ts_snap"]), _ms(expected["ts_snap"]))
+    np.testing.assert_allclose(got[BUCKET_COLS].to_numpy(), expected[BUCKET_COLS].to_numpy())
+
+
+def test_small_appends_match_compacted(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    _appended(path)
+    times = pd.date_range("2024-12-31T23:30Z", periods=90, freq="1min")
+
+    store = CurveStore([path], partition_rows=64)       # several multi‑row‑group partitions
+    assert 1 < len(store._parts) < 60
+    appended = store.asof(times, "binance")
+    expected = _reference(path, times, "binance")
+    np.testing.assert_array_equal(_ms(appended["ts_snap"]), _ms(expected["ts_snap"]))
+    np.testing.assert_array_equal(appended[BUCKET_COLS].to_numpy(), expected[BUCKET_COLS].to_numpy())
+
+    migrate_file(path, kind="long")                     # replaced on disk → re‑indexed
+    store.refresh()
+    assert len(store._parts) == 1
+    pd.testing.assert_frame_equal(store.asof(times, "binance"), appended)
+
+
+def test_refresh_picks_up_appends(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    _appended(path, n_snaps=3)
+    store = CurveStore([path])
+    assert len(store.range("2025-01-01", "2025-01-02", "binance")) == 2
+    _appended(path, n_snaps=6, first=3)
+    store.refresh()
+    assert len(store.range("2025-01-01", "2025-01-02", "binance")) == 6
+
+
+def test_unknown_exchange_and_ambiguous_symbol(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    _appended(path, n_snaps=3)
+    append_parquet(
+        read_parquet(path, CURVE_LONG_SCHEMA).assign(symbol="ETHUSDT"), path, CURVE_LONG_SCHEMA
+    )
+    store = CurveStore([path])
+    with pytest.raises(KeyError, match="no curve history for exchange 'okx'"):
+        store.at("2025-01-01T01:00Z", "okx")
+    with pytest.raises(KeyError, match="symbol required for 'binance'"):
+        store.at("2025-01-01T01:00Z", "binance")
+    assert store.at("2025-01-01T01:00Z", "binance", "ETHUSDT")[BUCKET_COLS].notna().all()
@@ -0,0 +1,162 @@
+"""CurveRollup cascade / window closing and snapshot‑aware retention."""
+from __future__ import annotations
+
+import shutil
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from funding_curve.builders.rollup import TIERS, CurveRollup, apply_retention
+from funding_curve.storage.db import append_parquet, expire_before, read_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, ROLLUP_SCHEMA
+
+FIXTURE = Path(__file__).resolve().parent / "data" / "curve_live_2025-05.parquet"
+T0 = 1_746_489_600_000          # 2025-05-06T00:00Z, a 10 min boundary
+KEY = ("binance", "BTCUSDT")
+TIER_1S, TIER_1MIN, TIER_10MIN = TIERS
+
+
+def _snapshot(exchange: str, ts: pd.Timestamp) -> pd.DataFrame:
+    """One 8‑row snapshot whose prints span the 56 h before *ts*."""
+    return pd.DataFrame({
+        "exchange": exchange,
+        "symbol": "BTCUSDT",
+        "ts_snap": [ts - pd.Timedelta(hours=8 * (7 - j)) for j in range(8)],
+        "bucket_start_h": np.arange(0, 64, 8),
+        "fwd_rate_ann": np.linspace(0.01, 0.08, 8),
+        "raw_rate": np.full(8, 1e-4),
+        "funding_time": [ts] * 8,
+    })
+
+
+def _curve(v: float) -> np.ndarray:
+    return np.full(8, v)
+
+
+# ---------------------------------------------------------------------------
+# Raw retention
+# ---------------------------------------------------------------------------
+
+def test_raw_expiry_drops_whole_snapshots(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    ts = pd.Timestamp("2025-05-10", tz="UTC")
+    for exchange, at in (("binance", ts), ("bybit", ts + pd.Timedelta(hours=8)), ("binance", ts + pd.Timedelta(hours=16))):
+        append_parquet(_snapshot(exchange, at), path, CURVE_LONG_SCHEMA)
+
+    # Cutoff falls inside every snapshot's 56 h span: only the first
+    # snapshot (newest print at *ts*) is older than it as a whole.
+    assert expire_before(path, CURVE_LONG_SCHEMA, ts + pd.Timedelta(hours=4), snapshots=True) == 8
+    df = read_parquet(path, CURVE_LONG_SCHEMA)
+    assert len(df) == 16 and (df["ts_snap"] < ts).any()
+    assert list(df["exchange"].astype(str)[::8]) == ["bybit", "binance"]
+    assert (df["bucket_start_h"].to_numpy().reshape(2, 8) == np.arange(0, 64, 8)).all()
+
+    # Nothing old enough as a whole → file untouched.
+    assert expire_before(path, CURVE_LONG_SCHEMA, ts + pd.Timedelta(hours=8), snapshots=True) == 0
+    assert len(read_parquet(path, CURVE_LONG_SCHEMA)) == 16
+
+
+def test_raw_retention_keeps_snapshots_intact(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    shutil.copy(FIXTURE, path)
+    before = read_parquet(path, CURVE_LONG_SCHEMA)
+    assert len(before) % 8 == 0
+    snap_ts = before["ts_snap"].groupby(np.arange(len(before)) // 8).max()
+
+    now = before["ts_snap"].max() + pd.Timedelta(hours=1)
+    removed = apply_retention(path, tiers=(), raw_retention=timedelta(hours=24), now=now)
+    cutoff = now - pd.Timedelta(hours=24)
+    expected = before[np.repeat((snap_ts >= cutoff).to_numpy(), 8)].reset_index(drop=True)
+
+    after = read_parquet(path, CURVE_LONG_SCHEMA)
+    assert removed == {"raw": len(before) - len(expected)} and 0 < len(after) < len(before)
+    pd.testing.assert_frame_equal(after, expected, check_categorical=False)
+    assert (after["ts_snap"] < cutoff).any()        # old prints of a fresh snapshot survive
+    assert (after["bucket_start_h"].to_numpy().reshape(-1, 8) == np.arange(0, 64, 8)).all()
+
+
+def test_tier_retention(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("storage/processed").mkdir(parents=True)
+    rollup = CurveRollup()
+    for day in range(4):
+        rollup.update_curve(KEY, T0 + day * 86_400_000, _curve(day))
+    rollup.flush()
+    for tier in TIERS:
+        append_parquet(rollup.drain(tier), tier.path, ROLLUP_SCHEMA)
+
+    now = pd.Timestamp(T0 + 3 * 86_400_000, unit="ms", tz="UTC")
+    removed = apply_retention(tmp_path / "curve_live.parquet", raw_retention=None, now=now)
+    assert removed == {"1s": 1, "1min": 0}          # 2 day retention drops day 0; 10 min kept forever
+    kept = read_parquet(TIER_1S.path, ROLLUP_SCHEMA)
+    assert kept["ts_window"].min() == pd.Timestamp(T0 + 86_400_000, unit="ms", tz="UTC")
+    assert len(read_parquet(TIER_10MIN.path, ROLLUP_SCHEMA)) == 4
+
+
+# ---------------------------------------------------------------------------
+# CurveRollup
+# ---------------------------------------------------------------------------
+
+def test_cascade_through_tiers():
+    rollup = CurveRollup()
+    # Three snapshots in one second, one more a second later, then one in the
+    # next minute: two 1 s windows fold into the first 1 min window.
+    for ts, v in ((T0, 1.0), (T0 + 200, 3.0), (T0 + 900, 2.0), (T0 + 1_000, 5.0), (T0 + 60_000, 4.0)):
+        rollup.update_curve(KEY, ts, _curve(v))
+    rollup.flush()
+
+    one_s = rollup.drain(TIER_1S)
+    assert list(one_s["n"]) == [3, 1, 1]
+    first = one_s.iloc[0]
+    assert (first["last_b_0"], first["mean_b_0"], first["min_b_0"], first["max_b_0"]) == (2.0, 2.0, 1.0, 3.0)
+
+    one_min = rollup.drain(TIER_1MIN)
+    assert list(one_min["n"]) == [4, 1]
+    first = one_min.iloc[0]
+    assert (first["last_b_0"], first["mean_b_0"], first["min_b_0"], first["max_b_0"]) == (5.0, 2.75, 1.0, 5.0)
+    assert list(one_min["ts_window"]) == list(pd.to_datetime([T0, T0 + 60_000], unit="ms", utc=True))
+
+    ten_min = rollup.drain(TIER_10MIN)
+    assert len(ten_min) == 1 and ten_min["n"].iloc[0] == 5 and ten_min["last_b_56"].iloc[0] == 4.0
+
+
+def test_late_snapshot_is_ignored():
+    rollup = CurveRollup()
+    rollup.update_curve(KEY, T0 + 2_000, _curve(1.0))
+    rollup.update_curve(KEY, T0 + 500, _curve(9.0))     # window already passed
+    rollup.flush()
+    assert list(rollup.drain(TIER_1S)["max_b_0"]) == [1.0]
+
+
+def test_close_before_closes_only_ended_windows():
+    rollup = CurveRollup()
+    rollup.update_curve(KEY, T0 + 500, _curve(1.0))
+    rollup.update_curve(("bybit", "BTCUSDT"), T0 + 1_500, _curve(2.0))
+
+    rollup.close_before(T0 + 1_000)                      # binance's 1 s window ended; bybit's has not
+    one_s = rollup.drain(TIER_1S)
+    assert list(one_s["exchange"]) == ["binance"]
+    assert rollup.drain(TIER_1MIN) is None               # its minute is still open
+
+    rollup.close_before(T0 + 60_000)                     # every 1 s and the 1 min windows end
+    assert list(rollup.drain(TIER_1S)["exchange"]) == ["bybit"]
+    assert sorted(rollup.drain(TIER_1MIN)["exchange"]) == ["binance", "bybit"]
+    assert rollup.drain(TIER_10MIN) is None
+
+    rollup.flush()
+    assert list(rollup.drain(TIER_10MIN)["n"]) == [1, 1]
+    assert not any(rollup._open)
+
+
+def test_drain_waits_for_min_rows():
+    rollup = CurveRollup()
+    for i in range(3):
+        rollup.update_curve(KEY, T0 + i * 1_000, _curve(i))
+    assert rollup.drain(TIER_1S, min_rows=3) is None     # two windows closed so far
+    rollup.flush()
+    df = rollup.drain(TIER_1S, min_rows=3)
+    assert len(df) == 3 and rollup.drain(TIER_1S) is None
+    assert list(df.columns) == ROLLUP_SCHEMA.names
+
@@ -0,0 +1,85 @@
+"""On‑disk layout of the schema‑enforcing parquet helpers."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from funding_curve.storage import db
+from funding_curve.storage.db import SchemaMismatch, append_parquet, check_schema, read_between, read_parquet
+from funding_curve.storage.schemas import CURVE_LONG_SCHEMA, to_table
+
+
+def _snapshot(exchange: str, symbol: str, ts: pd.Timestamp) -> pd.DataFrame:
+    return pd.DataFrame({
+        "exchange": exchange,
+        "symbol": symbol,
+        "ts_snap": [ts - pd.Timedelta(hours=8 * (7 - j)) for j in range(8)],
+        "bucket_start_h": np.arange(0, 64, 8),
+        "fwd_rate_ann": np.linspace(0.01, 0.08, 8),
+        "raw_rate": np.full(8, 1e-4),
+        "funding_time": [ts] * 8,
+    })
+
+
+def test_labels_round_trip_across_appends(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    ts = pd.Timestamp("2025-05-05", tz="UTC")
+    append_parquet(_snapshot("binance", "ETHUSDT", ts), path, CURVE_LONG_SCHEMA)
+    append_parquet(_snapshot("bybit", "BTCUSDT", ts), path, CURVE_LONG_SCHEMA)
+
+    # The file carries the storage schema exactly, and check_schema sees it.
+    assert pq.read_schema(path).field("exchange").type == pa.string()
+    check_schema(path, CURVE_LONG_SCHEMA)
+
+    df = read_parquet(path, CURVE_LONG_SCHEMA)
+    assert isinstance(df["exchange"].dtype, pd.CategoricalDtype)
+    assert list(df["exchange"].astype(str).unique()) == ["binance", "bybit"]
+    assert list(df["symbol"].astype(str).unique()) == ["ETHUSDT", "BTCUSDT"]
+    fp = pd.read_parquet(path, engine="fastparquet")
+    assert list(fp["exchange"].astype(str).unique()) == ["binance", "bybit"]
+
+
+def test_check_schema_rejects_other_label_type(tmp_path):
+    path = tmp_path / "curve_live.parquet"
+    table = to_table(_snapshot("binance", "BTCUSDT", pd.Timestamp("2025-05-05", tz="UTC")), CURVE_LONG_SCHEMA)
+    pq.write_table(table, path)
+    check_schema(path, CURVE_LONG_SCHEMA)
+    pq.write_table(table.set_column(0, "exchange", table["exchange"].dictionary_encode()), path)
+    with pytest.raises(SchemaMismatch):
+        check_schema(path, CURVE_LONG_SCHEMA)
+
+
+def _arrow_peak(fn):
+    """Run *fn* with a fresh Arrow memory pool; return (result, peak bytes)."""
+    pool, old = pa.proxy_memory_pool(pa.default_memory_pool()), pa.default_memory_pool()
+    pa.set_memory_pool(pool)
+    try:
+        return fn(), pool.max_memory()
+    finally:
+        pa.set_memory_pool(old)
+
+
+def test_window_read_on_compacted_file_follows_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "ROW_GROUP_ROWS", 8_192)
+    path = tmp_path / "curve_history.parquet"
+    n = 20_000
+    ts = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC")
+    append_parquet(pd.DataFrame({
+        "exchange": "binance",
+        "symbol": "BTCUSDT",
+        "ts_snap": np.repeat(ts, 8),
+        "bucket_start_h": np.tile(np.arange(0, 64, 8), n),
+        "fwd_rate_ann": np.random.default_rng(0).random(n * 8),
+        "raw_rate": np.full(n * 8, 1e-4),
+        "funding_time": np.repeat(ts, 8),
+    }), path, CURVE_LONG_SCHEMA, overwrite=True)       # one write, as compact / migrate do
+    assert pq.ParquetFile(path).num_row_groups == -(-n * 8 // 8_192)
+
+    window, window_peak = _arrow_peak(lambda: read_between(path, CURVE_LONG_SCHEMA, ts[1_000], ts[1_720]))
+    full, full_peak = _arrow_peak(lambda: read_parquet(path, CURVE_LONG_SCHEMA))
+    assert len(window) == 720 * 8
+    assert window["ts_snap"].between(ts[1_000], ts[1_719]).all()
+    assert window_peak < full_peak / 5                   # ~5 % of the rows → far below the full file
@@ -0,0 +1,27 @@
+"""Epoch‑millisecond helpers.
+
+Hot paths (WS decode → builder) carry timestamps as plain ``int`` epoch‑ms;
+``datetime`` / ``pd.Timestamp`` objects are only materialised at the
+storage or DataFrame boundary.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+__all__ = ["now_ms", "to_ms", "from_ms"]
+
+
+def now_ms() -> int:
+    """Current UTC wall‑clock time in epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def to_ms(dt: datetime) -> int:
+    """Timezone‑aware *dt* → epoch milliseconds."""
+    return int(dt.timestamp() * 1000)
+
+
+def from_ms(ms: int) -> datetime:
+    """Epoch milliseconds → timezone‑aware UTC ``datetime``."""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)